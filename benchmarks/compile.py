@@ -0,0 +1,64 @@
+"""Eager vs compiled (`LightcurveModel.compile`) evaluation of each bundled source.
+
+Usage: python benchmarks/compile.py [--nobs N] [--repeat R]
+"""
+
+from argparse import ArgumentParser
+from timeit import Timer
+
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Phaseshifted, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.sources.bayesn import BayeSNM20Source
+from slicsim.sources.hsiao import HsiaoSource
+from slicsim.sources.salt import SALT2Source, SALT3Source
+from slicsim.sources.snemo import SNEMO2Source, SNEMO7Source, SNEMO15Source
+
+
+parser = ArgumentParser()
+parser.add_argument('--nobs', type=int, default=100)
+parser.add_argument('--repeat', type=int, default=20)
+args = parser.parse_args()
+
+bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i, bandpasses.des_z]
+field = Field(
+    times=torch.linspace(-10, 40, args.nobs),
+    bands=[bands[i % len(bands)] for i in range(args.nobs)],
+    magsys=AB
+)
+
+params = dict(z=torch.tensor(0.3), phase0=torch.tensor(1.))
+sources = {
+    SALT2Source: dict(x_1=torch.tensor(0.5), c=torch.tensor(0.1)),
+    SALT3Source: dict(x_1=torch.tensor(0.5), c=torch.tensor(0.1)),
+    SNEMO2Source: dict(coeffs=torch.zeros(1), A_s=torch.tensor(0.1)),
+    SNEMO7Source: dict(coeffs=torch.zeros(6), A_s=torch.tensor(0.1)),
+    SNEMO15Source: dict(coeffs=torch.zeros(14), A_s=torch.tensor(0.1)),
+    HsiaoSource: dict(),
+    BayeSNM20Source: dict(theta=torch.tensor(1.)),
+}
+
+models = {
+    source: LightcurveModel(Distance(Redshifted(Phaseshifted(source()))), field, unitless=True)
+    for source in sources
+}
+
+for source, kwargs in sources.items():
+    kwargs = dict(params, **kwargs)
+    model = models[source]
+    compiled = model.compile()
+
+    tcompile = Timer(lambda: compiled(**kwargs)).timeit(1)
+    reference = model.bandcountscal(**kwargs)
+    err = ((compiled(**kwargs) - reference).abs().max() / reference.abs().max()).item()
+
+    teager, tcompiled = (
+        min(Timer(lambda: func(**kwargs)).repeat(args.repeat, 1))
+        for func in (model.bandcountscal, compiled)
+    )
+    print(f'{source.__name__:>16}  compile: {tcompile:6.2f} s'
+          f'  eager: {1e3*teager:8.2f} ms  compiled: {1e3*tcompiled:8.2f} ms ({teager / tcompiled:4.2f}x)'
+          f'  max rel. diff: {err:.1e}')
@@ -0,0 +1,78 @@
+"""Peak memory and time of a gradient of `LightcurveModel.bandcountscal`,
+with and without checkpointed integration (``checkpoint_points``).
+
+Each mode runs in a fresh interpreter, and its peak resident memory is
+reported above that after setting up the model (and evaluating it once
+without gradients). The gradients of the modes are checked to agree.
+
+Usage: python benchmarks/gradient_memory.py [--nobjects N] [--nobs N] [--points N ...]
+"""
+
+import json
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+
+RUN = '''
+import json, resource, sys, time
+import torch
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Phaseshifted, Redshifted
+from slicsim.model import FieldBatch, LightcurveModel
+from slicsim.sources.salt import SALT2Source
+
+nobjects, nobs, points = json.loads(sys.argv[1])
+bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i, bandpasses.des_z]
+field = FieldBatch(
+    times=torch.linspace(-10, 40, nobs).repeat(nobjects),
+    bands=nobjects * [bands[i % len(bands)] for i in range(nobs)],
+    magsys=AB, nobs=nobjects * [nobs]
+)
+model = LightcurveModel(Distance(Redshifted(Phaseshifted(SALT2Source()))), field,
+                        unitless=True, checkpoint_points=points)
+g = torch.Generator().manual_seed(42)
+params = dict(
+    z=torch.rand(nobjects, generator=g) / 2 + 0.1, phase0=torch.randn(nobjects, generator=g),
+    x_1=torch.randn(nobjects, 1, generator=g), c=torch.randn(nobjects, generator=g) / 10,
+)
+with torch.no_grad():
+    model.bandcountscal(**params)
+
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+for p in params.values():
+    p.requires_grad_()
+t0 = time.perf_counter()
+grads = torch.autograd.grad(model.bandcountscal(**params).sum() * 1e30, list(params.values()))
+t = time.perf_counter() - t0
+print(json.dumps(dict(
+    npoints=len(field._evaluation_points.times), time=t,
+    memory=(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024,
+    grads=[g.flatten().tolist() for g in grads]
+)))
+'''
+
+parser = ArgumentParser()
+parser.add_argument('--nobjects', type=int, default=100)
+parser.add_argument('--nobs', type=int, default=40)
+parser.add_argument('--points', type=int, nargs='*', default=[10_000, 100_000])
+args = parser.parse_args()
+
+
+def run(points):
+    return json.loads(subprocess.run(
+        [sys.executable, '-c', RUN, json.dumps([args.nobjects, args.nobs, points])],
+        capture_output=True, text=True, check=True).stdout.splitlines()[-1])
+
+
+reference = run(None)
+print(f'{args.nobjects * args.nobs} observations, {reference["npoints"]} evaluation points')
+print(f'{"checkpoint_points":>18} {"peak MiB":>10} {"time s":>8} {"max grad rel. err.":>20}')
+for points in (None, *args.points):
+    res = reference if points is None else run(points)
+    err = max(
+        abs(a - b) / max(map(abs, r), default=1)
+        for g, r in zip(res['grads'], reference['grads']) for a, b in zip(g, r)
+    )
+    print(f'{str(points):>18} {res["memory"]:>10.1f} {res["time"]:>8.2f} {err:>20.1e}')
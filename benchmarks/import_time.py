@@ -0,0 +1,54 @@
+"""Time of importing `slicsim` modules, on top of `torch`.
+
+Each import is timed in a fresh interpreter (the median of ``--repeat``
+runs), after `torch` is already imported, since it dominates and is outside
+of `slicsim`'s control. Everything else, including the parts of `phytorch`
+that a module imports (its units alone take more than a second), counts
+towards the module. Exits with a nonzero status if any module exceeds
+``--budget`` seconds.
+
+The default budget is about three times the slowest module as measured
+(about 0.05 s, with `phytorch.units`, `phytorch.constants` and
+`phytorch.cosmology` imported lazily), so that importing any of these
+eagerly again exceeds it.
+
+Usage: python benchmarks/import_time.py [--repeat R] [--budget SECONDS]
+"""
+
+import subprocess
+import sys
+from argparse import ArgumentParser
+from statistics import median
+
+
+BASELINE = 'torch'
+MODULES = (
+    'slicsim', 'slicsim.model', 'slicsim.effects', 'slicsim.functional', 'slicsim.bandpasses.magsys',
+    'slicsim.sources.salt', 'slicsim.sources.snemo', 'slicsim.sources.hsiao', 'slicsim.sources.bayesn',
+)
+
+parser = ArgumentParser()
+parser.add_argument('--repeat', type=int, default=5)
+parser.add_argument('--budget', type=float, default=0.15)
+args = parser.parse_args()
+
+
+def timeit(module: str) -> float:
+    return median(
+        float(subprocess.run([sys.executable, '-c', (
+            f'import {BASELINE}; from time import perf_counter; t0 = perf_counter(); '
+            f'import {module}; print(perf_counter() - t0)'
+        )], capture_output=True, text=True, check=True).stdout)
+        for _ in range(args.repeat)
+    )
+
+
+over = []
+for module in MODULES:
+    t = timeit(module)
+    print(f'{module:<30} +{t:.3f} s')
+    if t > args.budget:
+        over.append(module)
+
+if over:
+    sys.exit(f'Over the budget of {args.budget} s: {", ".join(over)}')
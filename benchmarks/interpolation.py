@@ -0,0 +1,39 @@
+"""Cell lookup on the trained template grids: arithmetic vs binary search.
+
+Usage: python benchmarks/interpolation.py [--npoints N] [--repeat R]
+"""
+
+from argparse import ArgumentParser
+from timeit import Timer
+
+import torch
+
+from slicsim.sources.hsiao import HsiaoSource
+from slicsim.sources.salt import SALT2Source, SALT3Source
+from slicsim.sources.snemo import SNEMO7Source
+
+
+parser = ArgumentParser()
+parser.add_argument('--npoints', type=int, default=1_000_000)
+parser.add_argument('--repeat', type=int, default=5)
+args = parser.parse_args()
+
+for source in (SALT2Source, SALT3Source, SNEMO7Source, HsiaoSource):
+    interp = source.grid_interpolator
+    phase, wave = (
+        g[0] + (g[-1] - g[0]) * torch.rand(args.npoints, dtype=g.dtype)
+        for g in (source.grid_phase, source.grid_wave)
+    )
+    search = type(interp)(interp.grids, interp.values, interp.channel_ndim, uniform=len(interp.grids)*(False,))
+
+    def timeit(func):
+        return min(Timer(func).repeat(args.repeat, 1))
+
+    print(f'{source.__name__:>14}  uniform={"".join("YN"[not u] for u in interp.uniform)}', end='')
+    for label, func in (
+        ('cells', lambda i: (i.project(phase, 0), i.project(wave, 1))),
+        ('plan', lambda i: i.plan(phase, wave))
+    ):
+        tsearch, tlookup = timeit(lambda: func(search)), timeit(lambda: func(interp))
+        print(f'  {label}: {1e3*tsearch:7.2f} -> {1e3*tlookup:7.2f} ms ({tsearch / tlookup:4.2f}x)', end='')
+    print()
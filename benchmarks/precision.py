@@ -0,0 +1,49 @@
+"""Magnitude errors of single and mixed precision (`slicsim.precision.compare`)
+with respect to double precision, for each bundled source.
+
+Usage: python benchmarks/precision.py [--nobs N] [--min-flux F]
+"""
+
+from argparse import ArgumentParser
+
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Phaseshifted, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.precision import compare
+from slicsim.sources.bayesn import BayeSNM20Source
+from slicsim.sources.hsiao import HsiaoSource
+from slicsim.sources.salt import SALT2Source, SALT3Source
+from slicsim.sources.snemo import SNEMO2Source, SNEMO7Source, SNEMO15Source
+
+
+parser = ArgumentParser()
+parser.add_argument('--nobs', type=int, default=200)
+parser.add_argument('--min-flux', type=float, default=1e-2)
+args = parser.parse_args()
+
+bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i, bandpasses.des_z]
+field = Field(
+    times=torch.linspace(-10, 40, args.nobs),
+    bands=[bands[i % len(bands)] for i in range(args.nobs)],
+    magsys=AB
+)
+
+params = dict(z=torch.tensor(0.3), phase0=torch.tensor(1.))
+sources = {
+    SALT2Source: dict(x_1=torch.tensor(0.5), c=torch.tensor(0.1)),
+    SALT3Source: dict(x_1=torch.tensor(0.5), c=torch.tensor(0.1)),
+    SNEMO2Source: dict(coeffs=torch.zeros(1), A_s=torch.tensor(0.1)),
+    SNEMO7Source: dict(coeffs=torch.zeros(6), A_s=torch.tensor(0.1)),
+    SNEMO15Source: dict(coeffs=torch.zeros(14), A_s=torch.tensor(0.1)),
+    HsiaoSource: dict(),
+    BayeSNM20Source: dict(theta=torch.tensor(1.)),
+}
+
+print(f'{"source":<16} {"float32":>10} {"mixed":>10}  (max |dmag|)')
+for source, kwargs in sources.items():
+    model = LightcurveModel(Distance(Redshifted(Phaseshifted(source()))), field, unitless=True)
+    errs = compare(model, min_flux=args.min_flux, **params, **kwargs)
+    print(f'{source.__name__:<16} {errs["float32"]:>10.2e} {errs["mixed"]:>10.2e}')
@@ -0,0 +1,275 @@
+"""Throughput, latency and peak memory of `LightcurveModel.bandcountscal`.
+
+Cases cover every bundled source (wrapped in ``Distance(Redshifted(...))``)
+over field sizes and parameter batch sizes, and every effect in
+`slicsim.effects` on top of `HsiaoSource`. Batched cases with more than
+`POINTS_BUDGET` (batch element, evaluation point) pairs are skipped and
+listed at the end; fields of a single observation (about 200 evaluation
+points) keep batches of up to 10^4 within it. Results are written as JSON
+(by default to ``benchmarks/results/``, which is not tracked), together with
+the commit and environment, so that runs on different commits can be
+compared with ``--compare``.
+
+Usage:
+    python benchmarks/suite.py [--quick] [-k PATTERN] [-o OUTPUT] [--compare BASELINE]
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import platform
+import re
+import subprocess
+import sys
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+import torch
+from torch import Tensor
+from torch.profiler import profile, ProfilerActivity
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import CosmologicalDistance, Distance, Extincted, Phaseshifted, Redshifted
+from slicsim.model import Field, LightcurveModel
+
+
+FIELD_SIZES = (1, 10, 100, 1_000, 10_000, 100_000)
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000)
+# maximum number of (batch element, evaluation point) pairs in a batched case
+POINTS_BUDGET = 10_000_000
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    """Peak memory (in bytes) held by tensors allocated during ``func()``,
+    from the memory timeline of `torch.profiler`."""
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True, record_shapes=True, with_stack=True) as prof:
+        func()
+    with TemporaryDirectory() as tmpdir:
+        fname = Path(tmpdir) / 'memory.raw.json.gz'
+        prof.export_memory_timeline(str(fname), 'cpu')
+        events = json.loads(gzip.decompress(fname.read_bytes()))
+    # (time, action, signed bytes, category), where action 1 marks tensors that existed before
+    return max(accumulate(nbytes for _, action, nbytes, _ in events if action != 1), default=0)
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    nobs: int
+    batch: int
+
+
+@dataclass
+class Result:
+    name: str
+    nobs: int
+    batch: int
+    npoints: Optional[int] = None
+    repeat: Optional[int] = None
+    latency: Optional[float] = None  # median seconds per call
+    latency_min: Optional[float] = None
+    throughput: Optional[float] = None  # (batch element, observation) pairs per second
+    peak_memory: Optional[int] = None  # bytes
+    error: Optional[str] = None
+
+
+_bands = (bandpasses.des_g, bandpasses.des_r, bandpasses.des_i, bandpasses.des_z)
+_fields: dict[int, Field] = {}
+
+
+def make_field(nobs: int) -> Field:
+    if nobs not in _fields:
+        gen = torch.Generator().manual_seed(nobs)
+        _fields[nobs] = Field.from_codes(
+            -10 + 50 * torch.rand(nobs, generator=gen), _bands,
+            torch.randint(len(_bands), (nobs,), generator=gen), AB
+        ).cache()
+    return _fields[nobs]
+
+
+def batched(value: float, batch: int, *trailing: int) -> Tensor:
+    # [batch, 1 (points), *trailing], or just [*trailing] for batch == 1
+    return torch.full(((batch, 1) if batch > 1 else ()) + trailing, float(value))
+
+
+def source_params(name: str, batch: int) -> Mapping[str, Tensor]:
+    ret = dict(z=batched(0.1, batch))
+    if name.startswith('SALT'):
+        ret.update(x_1=batched(0.5, batch, 1), c=batched(0.05, batch))
+    elif name.startswith('SNEMO'):
+        ncomp = int(re.search(r'\d+', name)[0])
+        ret.update(coeffs=batched(0.1, batch, ncomp - 1), A_s=batched(0.05, batch))
+    elif name.startswith('BayeSN'):
+        ret.update(theta=batched(0.5, batch), delta_M=batched(0.1, batch))
+    return ret
+
+
+def sources() -> Mapping[str, Callable[[], Any]]:
+    from slicsim.sources import bayesn, hsiao, salt, snemo
+
+    return {
+        'Hsiao': hsiao.HsiaoSource,
+        'SALT2': salt.SALT2Source, 'SALT3': salt.SALT3Source,
+        'SNEMO2': snemo.SNEMO2Source, 'SNEMO7': snemo.SNEMO7Source, 'SNEMO15': snemo.SNEMO15Source,
+        'BayeSNM20': bayesn.BayeSNM20Source, 'BayeSNT21': bayesn.BayeSNT21Source, 'BayeSNW22': bayesn.BayeSNW22Source,
+    }
+
+
+def effects() -> Mapping[str, tuple[Callable[[Any], Any], Callable[[int], Mapping[str, Tensor]]]]:
+    from slicsim.extinction import Fitzpatrick99
+
+    def cosmological(base):
+        from phytorch.cosmology.drivers.analytic import FlatLambdaCDM
+        from phytorch.units.astro import Mpc
+        from phytorch.units.si import km, second
+
+        return CosmologicalDistance(base=base, cosmo=FlatLambdaCDM(H0=70*km/second/Mpc, Om0=0.3))
+
+    def distance(batch):
+        from phytorch.units.astro import pc
+
+        return dict(distance=batched(10., batch) * pc)
+
+    # effects other than distances are wrapped in a `Distance`,
+    # so that calibrated fluxes can be computed
+    return {
+        'Phaseshifted': (lambda base: Distance(Phaseshifted(base=base)), lambda batch: dict(phase0=batched(1., batch))),
+        'Redshifted': (lambda base: Distance(Redshifted(base=base)), lambda batch: dict(z=batched(0.1, batch))),
+        'Extincted': (lambda base: Distance(Extincted(base=base, ext=Fitzpatrick99())), lambda batch: dict(A=batched(0.3, batch))),
+        'Distance': (lambda base: Distance(base=base), distance),
+        'CosmologicalDistance': (cosmological, lambda batch: dict(z_cosmo=batched(0.1, batch))),
+    }
+
+
+def model_case(name: str, make_source: Callable[[], Any], nobs: int, batch: int, params: Callable[[int], Mapping]) -> Case:
+    def setup():
+        model = LightcurveModel(make_source(), make_field(nobs))
+        kwargs = params(batch)
+        return lambda: model.bandcountscal(**kwargs)
+
+    return Case(name, setup, nobs, batch)
+
+
+def cases(field_sizes=FIELD_SIZES, batch_sizes=BATCH_SIZES) -> Iterator[Case]:
+    for sname, source in sources().items():
+        for nobs in field_sizes:
+            for batch in batch_sizes:
+                yield model_case(
+                    f'source/{sname}', lambda source=source: Distance(Redshifted(source())),
+                    nobs, batch, lambda batch, sname=sname: source_params(sname, batch))
+
+    from slicsim.sources.hsiao import HsiaoSource
+
+    for ename, (effect, params) in effects().items():
+        for nobs in field_sizes[:5]:
+            for batch in batch_sizes[:3]:
+                yield model_case(f'effect/{ename}', lambda effect=effect: effect(HsiaoSource()), nobs, batch, params)
+
+
+def npoints(nobs: int) -> int:
+    return len(make_field(nobs)._evaluation_points.times)
+
+
+def run(case: Case, min_time: float, max_repeat: int) -> Result:
+    res = Result(case.name, case.nobs, case.batch)
+    try:
+        res.npoints = npoints(case.nobs)
+        if case.batch > 1 and res.npoints * case.batch > POINTS_BUDGET:
+            res.error = 'skipped: over points budget'
+            return res
+
+        func = case.setup()
+        func()  # warm up: lazy data loading and caches
+
+        times = []
+        while len(times) < max_repeat and (len(times) < 3 or sum(times) < min_time):
+            t0 = perf_counter()
+            func()
+            times.append(perf_counter() - t0)
+
+        res.repeat = len(times)
+        res.latency, res.latency_min = median(times), min(times)
+        res.throughput = case.nobs * case.batch / res.latency
+        res.peak_memory = peak_memory(func)
+    except Exception as e:
+        res.error = f'{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ""}'
+    return res
+
+
+def metadata() -> Mapping[str, Any]:
+    def git(*args):
+        try:
+            return subprocess.run(('git', *args), capture_output=True, text=True,
+                                  cwd=Path(__file__).parent).stdout.strip() or None
+        except OSError:
+            return None
+
+    return dict(
+        commit=git('rev-parse', 'HEAD'),
+        dirty=bool(git('status', '--porcelain', '--untracked-files=no')),
+        date=datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        python=platform.python_version(), torch=torch.__version__,
+        platform=platform.platform(), processor=platform.processor(),
+        threads=torch.get_num_threads(),
+    )
+
+
+def compare(results: list[Result], baseline: Mapping[str, Any]):
+    old = {(r['name'], r['nobs'], r['batch']): r for r in baseline['results']}
+    print(f'\nCompared to {baseline["meta"]["commit"]}: new / old latency')
+    for r in results:
+        o = old.get((r.name, r.nobs, r.batch))
+        if o and o['latency'] and r.latency:
+            print(f'{r.name:>28} {r.nobs:>7} {r.batch:>6}  {r.latency / o["latency"]:6.2f}')
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--quick', action='store_true', help='only small fields and batches')
+    parser.add_argument('-k', dest='pattern', default='', help='only cases whose name matches this regex')
+    parser.add_argument('-o', '--output', type=Path, help='JSON output (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', type=Path, help='a previous JSON output to compare against')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum total timing per case in seconds')
+    parser.add_argument('--max-repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    meta = metadata()
+    selected = [
+        case for case in (cases((10, 1_000), (1, 100)) if args.quick else cases())
+        if re.search(args.pattern, case.name)
+    ]
+
+    results = []
+    for case in selected:
+        results.append(res := run(case, args.min_time, args.max_repeat))
+        print(f'{res.name:>28} {res.nobs:>7} {res.batch:>6}  ' + (
+            res.error if res.error else
+            f'{1e3*res.latency:10.3f} ms  {res.throughput:10.3g} obs/s  {res.peak_memory / 2**20:9.1f} MiB'
+        ), file=sys.stderr)
+
+    skipped = [res for res in results if res.error and res.error.startswith('skipped')]
+    if skipped:
+        print(f'Skipped {len(skipped)} cases over the points budget of {POINTS_BUDGET}: ' + ', '.join(
+            f'{res.name} ({res.nobs} obs, batch {res.batch})' for res in skipped), file=sys.stderr)
+
+    output = args.output or Path(__file__).parent / 'results' / f'{meta["commit"] or "unknown"}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(dict(meta=meta, results=list(map(asdict, results))), indent=1))
+    print(f'Results written to {output}', file=sys.stderr)
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == '__main__':
+    main()
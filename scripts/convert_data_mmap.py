@@ -0,0 +1,64 @@
+"""Convert ``.pt`` data files to a memory-mappable layout (see `slicsim.utils.load_data`).
+
+Files are re-saved in the zip serialisation format (which `torch.load` can
+memory-map) with every tensor stored contiguously in its own compact
+storage, so that mapping a tensor does not map unrelated data. By default,
+all files in the bundled data directory are converted in place.
+
+Usage:
+    python scripts/convert_data_mmap.py [--check] [PATH ...]
+"""
+
+import zipfile
+from argparse import ArgumentParser
+from pathlib import Path
+
+import torch
+
+import phytorchx
+from slicsim.utils import datadir
+
+
+def compact(obj):
+    if torch.is_tensor(obj):
+        return obj.detach().clone(memory_format=torch.contiguous_format)
+    if isinstance(obj, dict):
+        return type(obj)((key, compact(val)) for key, val in obj.items())
+    if isinstance(obj, (tuple, list)):
+        return type(obj)(map(compact, obj))
+    return obj
+
+
+def is_compact(obj) -> bool:
+    if torch.is_tensor(obj):
+        return obj.is_contiguous() and obj.untyped_storage().nbytes() == obj.numel() * obj.element_size()
+    if isinstance(obj, dict):
+        return all(map(is_compact, obj.values()))
+    if isinstance(obj, (tuple, list)):
+        return all(map(is_compact, obj))
+    return True
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', type=Path, help='files or directories (default: the bundled data)')
+    parser.add_argument('--check', action='store_true', help='only report files that need converting')
+    args = parser.parse_args()
+
+    fnames = [
+        fname for path in (args.paths or [datadir])
+        for fname in (sorted(path.rglob('*.pt')) if path.is_dir() else [path])
+    ]
+    for fname in fnames:
+        obj = phytorchx.load(fname)
+        if zipfile.is_zipfile(fname) and is_compact(obj):
+            continue
+        print(('NEEDS CONVERTING' if args.check else 'CONVERTING'), fname)
+        if not args.check:
+            torch.save(compact(obj), fname)
+            loaded = phytorchx.load(fname, mmap=True)
+            assert is_compact(loaded), fname
+
+
+if __name__ == '__main__':
+    main()
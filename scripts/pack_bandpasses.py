@@ -0,0 +1,27 @@
+"""Pack the bundled bandpasses into a single archive (see `slicsim.bandpasses`).
+
+Every ``data/bandpasses/<group>/<name>.pt`` file (a tuple of wavelengths and
+transmissions) is appended to ``data/bandpasses.bin`` as raw float32 values,
+and its offset and length are recorded in ``data/bandpasses.json``.
+"""
+
+import json
+
+import numpy as np
+
+import phytorchx
+from slicsim.bandpasses import archive_paths, bandpassdir
+
+
+binfile, indexfile = archive_paths()
+
+index, chunks, offset = {}, [], 0
+for fname in sorted(bandpassdir.rglob('*.pt')):
+    wave, trans = (np.asarray(t, dtype=np.float32) for t in phytorchx.load(fname))
+    index[fname.stem] = (offset, len(wave))
+    chunks.extend((wave, trans))
+    offset += 2 * len(wave)
+
+np.concatenate(chunks).astype('<f4').tofile(binfile)
+indexfile.write_text(json.dumps(dict(dtype='<f4', bands=index)))
+print(f'Packed {len(index)} bandpasses into {binfile}.')
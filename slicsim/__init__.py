@@ -1 +1,2 @@
-from ._version import __version__, version, __version_tuple__, version_tuple
\ No newline at end of file
+from ._version import __version__, version, __version_tuple__, version_tuple
+from .profiling import profile
@@ -1,3 +1,9 @@
+import json
+from functools import cache
+
+import numpy as np
+import torch
+
 import phytorchx
 
 from .bandpass import LinearInterpolatedBandpass
@@ -7,8 +13,33 @@ from ..utils import datadir
 bandpassdir = datadir / 'bandpasses'
 
 
+def archive_paths():
+    """The packed bandpasses (see ``scripts/pack_bandpasses.py``): raw
+    wavelengths and transmissions, and an index of their ``dtype`` and
+    ``name -> (offset, length)`` into them."""
+    return datadir / 'bandpasses.bin', datadir / 'bandpasses.json'
+
+
+@cache
+def _archive() -> tuple[torch.Tensor, dict[str, tuple[int, int]]]:
+    binfile, indexfile = archive_paths()
+    if not indexfile.is_file():
+        return torch.empty(0), {}
+    meta = json.loads(indexfile.read_text())
+    dtype = np.dtype(meta['dtype'])
+    if dtype.isnative:
+        # memory-mapped (copy-on-write), so only bands that are used are read
+        data = torch.from_file(
+            str(binfile), shared=False, size=binfile.stat().st_size // dtype.itemsize,
+            dtype=torch.from_numpy(np.empty(0, dtype)).dtype)
+    else:
+        data = torch.from_numpy(np.fromfile(binfile, dtype).astype(dtype.newbyteorder('=')))
+    return data, meta['bands']
+
+
 def __dir__():
-    return [p.stem for p in bandpassdir.rglob(f'*.pt')]
+    # bands may have been added after packing
+    return sorted({*_archive()[1], *(p.stem for p in bandpassdir.rglob(f'*.pt'))})
 
 
 def __getattr__(name):
@@ -17,10 +48,16 @@ def __getattr__(name):
     elif name.startswith('__4shooter2'):
         name = name[2:]
 
-    try:
-        fname = next(bandpassdir.rglob(f'*/{name}.pt'))
-    except StopIteration:
-        raise NameError(f'No bandpass named \'{name}\'.') from None
-
-    globals()[name] = ret = LinearInterpolatedBandpass(name, phytorchx.load(fname))
+    data, index = _archive()
+    if name in index:
+        offset, length = index[name]
+        wave_trans = data[offset:offset+length].clone(), data[offset+length:offset+2*length].clone()
+    else:
+        # not packed, e.g. added after packing
+        try:
+            wave_trans = phytorchx.load(next(bandpassdir.rglob(f'*/{name}.pt')))
+        except StopIteration:
+            raise NameError(f'No bandpass named \'{name}\'.') from None
+
+    globals()[name] = ret = LinearInterpolatedBandpass(name, wave_trans)
     return ret
@@ -2,16 +2,18 @@ from __future__ import annotations
 
 import dataclasses
 from dataclasses import dataclass
+import functools
 from inspect import getattr_static
+from math import pi
 
 import torch
 from torch import Tensor
 
-from phytorch.units.si import angstrom
 from phytorchx import mid_many
 
 from ..extinction import Extinction, InterpolatedExtinction
 from ..utils import _t, cached_property
+from ..utils.diskcache import cached, fingerprint
 from ..utils.interpolated import Linear1dInterpolated
 
 
@@ -22,6 +24,9 @@ class Bandpass(Extinction):
     _wave: Tensor = dataclasses.field(init=False, repr=False, compare=False, hash=False)
     _trans: Tensor = dataclasses.field(init=False, repr=False, compare=False, hash=False)
 
+    # module-level singletons: converted once per dtype and device (see `utils.migrate`)
+    _migrate_once = True
+
     @property
     def minwave(self) -> _t:
         return self._wave[..., 0]
@@ -46,12 +51,75 @@ class Bandpass(Extinction):
     def trans_dwave(self) -> Tensor:
         return self.trans * self.dwave
 
+    @cached_property
+    def _cache_key(self) -> str:
+        # identifies the band's data in the on-disk cache (see `utils.diskcache`)
+        return fingerprint(type(self).__name__, self.name, self._wave, self._trans)
+
+    @functools.cached_property
+    def _quadratures(self) -> dict[tuple[float, float], tuple[Tensor, Tensor]]:
+        # per instance, so that it is released (and not shared between
+        # bandpasses that compare equal by name) with the bandpass
+        return {}
+
+    def quadrature(self, rtol: float, scale: float = 1000.) -> tuple[Tensor, Tensor]:
+        """Reduced quadrature nodes and weights for integrating over the band.
+
+        The nodes are equally spaced over the band, and the weights integrate
+        exactly (with respect to the native `wave` / `trans_dwave` rule) the
+        transmission times the linear interpolant of the integrand between the
+        nodes. The number of nodes is increased until a set of smooth test
+        spectra (power laws and sinusoids with period ``scale``, in angstrom)
+        are integrated to within a relative tolerance ``rtol``.
+
+        Returns
+        -------
+        :
+            ``(wave, trans_dwave)`` to be used in place of the native ones
+        """
+        key = rtol, scale
+        if key not in self._quadratures:
+            self._quadratures[key] = cached(lambda: self._quadrature(rtol, scale), 'quadrature', self._cache_key, rtol, scale)
+        return self._quadratures[key]
+
+    def _quadrature(self, rtol: float, scale: float) -> tuple[Tensor, Tensor]:
+        wave, trans_dwave = self.wave, self.trans_dwave
+        wave0 = (wave * trans_dwave).sum(-1) / trans_dwave.sum(-1)
+
+        def tests(w):
+            return torch.stack((
+                *((w / wave0)**k for k in (-4, -2, 0, 2)),
+                *(1 + torch.cos(2*pi * w / scale + phi) for phi in (0, pi/2))
+            ), 0)
+
+        exact = (tests(wave) * trans_dwave).sum(-1)
+
+        n = 4
+        while n < wave.shape[-1]:
+            nodes = torch.linspace(self.minwave, self.maxwave, n, dtype=wave.dtype, device=wave.device)
+            idx = torch.searchsorted(nodes, wave, right=True).clamp_(1, n-1).sub_(1)
+            t = (wave - nodes[idx]) / (nodes[idx+1] - nodes[idx])
+            weights = (
+                trans_dwave.new_zeros(n)
+                .index_add_(-1, idx, trans_dwave * (1-t))
+                .index_add_(-1, idx+1, trans_dwave * t)
+            )
+
+            if (((tests(nodes) * weights).sum(-1) - exact).abs() <= rtol * exact.abs()).all():
+                return nodes, weights
+            n = int(1.25 * n) + 1
+        return wave, trans_dwave
+
     @cached_property
     def uwave(self) -> Tensor:
+        from phytorch.units.si import angstrom
+
         return self.wave * angstrom
 
     @cached_property
     def utrans_dwave(self) -> Tensor:
+        from phytorch.units.si import angstrom
+
         return self.trans_dwave * angstrom
 
 
@@ -2,44 +2,98 @@ import copyreg
 from abc import ABC, abstractmethod, ABCMeta
 from functools import cache, cached_property
 from inspect import getattr_static
-from typing import ClassVar, Mapping, NamedTuple, Iterable
+from typing import Mapping, NamedTuple, Iterable, Optional, Sequence
 
+import torch
 from torch import Tensor
 
-import phytorchx
-from phytorch.constants import c, h
-from phytorch.units.astro import jansky
-from phytorch.units.cgs import erg
-from phytorch.units.si import centimeter, second, angstrom
 from .bandpass import Bandpass
+from .. import utils
+from ..utils.diskcache import cached, fingerprint, get_cache
 from ..utils.interpolated import Linear1dInterpolated
 
 
 class MagSys(ABC):
+    # module-level singletons: converted once per dtype and device (see `utils.migrate`)
+    _migrate_once = True
+
     @abstractmethod
     def zp_flux(self, band: Bandpass): ...
 
     @abstractmethod
     def zp_counts(self, band: Bandpass): ...
 
+    def zp_flux_many(self, bands: Sequence[Bandpass]):
+        return torch.stack([self.zp_flux(band) for band in bands])
+
+    def zp_counts_many(self, bands: Sequence[Bandpass]):
+        return torch.stack([self.zp_counts(band) for band in bands])
+
 
 class SpectralMagSys(MagSys):
+    # Identifies the spectrum in the on-disk cache (see `utils.diskcache`);
+    # zero points of magnitude systems without one are not cached on disk.
+    _cache_key: Optional[str] = None
+
     @abstractmethod
     def f0_wave(self, wave): ...
 
+    def _cached(self, func, name: str, bands: Sequence[Bandpass]):
+        if get_cache() is None or self._cache_key is None:
+            return func()
+        return cached(func, name, self._cache_key, [band._cache_key for band in bands])
+
     @cache
     def zp_flux(self, band: Bandpass):
-        return (self.f0_wave(band.uwave) * band.utrans_dwave).sum()
+        return self._cached(lambda: (self.f0_wave(band.uwave) * band.utrans_dwave).sum(), 'zp_flux', [band])
 
     @cache
     def zp_counts(self, band: Bandpass):
-        return (self.f0_wave(band.uwave) / (h*c/band.uwave) * band.utrans_dwave).sum()
+        from phytorch.constants import c, h
+
+        return self._cached(lambda: (self.f0_wave(band.uwave) / (h*c/band.uwave) * band.utrans_dwave).sum(), 'zp_counts', [band])
+
+    @staticmethod
+    def _padded(bands: Sequence[Bandpass]):
+        # pad with the last wavelength (so that f0 is finite) and zero weight
+        from phytorch.units.si import angstrom
+
+        n = max(len(band.wave) for band in bands)
+        return (
+            torch.stack([torch.cat((band.wave, band.wave[-1:].expand(n - len(band.wave)))) for band in bands]) * angstrom,
+            torch.stack([torch.cat((band.trans_dwave, band.trans_dwave.new_zeros(n - len(band.wave)))) for band in bands]) * angstrom
+        )
+
+    def _zp_flux_many(self, bands: Sequence[Bandpass]):
+        uwave, utrans_dwave = self._padded(bands)
+        return (self.f0_wave(uwave) * utrans_dwave).sum(-1)
+
+    def _zp_counts_many(self, bands: Sequence[Bandpass]):
+        from phytorch.constants import c, h
+
+        uwave, utrans_dwave = self._padded(bands)
+        return (self.f0_wave(uwave) / (h*c/uwave) * utrans_dwave).sum(-1)
+
+    def zp_flux_many(self, bands: Sequence[Bandpass]):
+        return self._cached(lambda: self._zp_flux_many(bands), 'zp_flux_many', bands)
+
+    def zp_counts_many(self, bands: Sequence[Bandpass]):
+        return self._cached(lambda: self._zp_counts_many(bands), 'zp_counts_many', bands)
 
 
 class _AB(SpectralMagSys):
-    f0_freq: ClassVar = 10**(23 - 0.4*48.6) * jansky
+    @classmethod
+    @utils.cached_property
+    def f0_freq(cls):
+        from phytorch.units.astro import jansky
+
+        return 10**(23 - 0.4*48.6) * jansky
+
+    _cache_key = 'AB'
 
     def f0_wave(self, wave):
+        from phytorch.constants import c
+
         return self.f0_freq * c / wave**2
 
 
@@ -47,8 +101,20 @@ AB = _AB()
 
 
 class InterpolatedSpectralMagSys(Linear1dInterpolated, SpectralMagSys):
-    _wave_unit = angstrom
-    _flux_unit = erg / angstrom / second / centimeter**2
+    @classmethod
+    @utils.cached_property
+    def _wave_unit(cls):
+        from phytorch.units.si import angstrom
+
+        return angstrom
+
+    @classmethod
+    @utils.cached_property
+    def _flux_unit(cls):
+        from phytorch.units.cgs import erg
+        from phytorch.units.si import centimeter, second, angstrom
+
+        return erg / angstrom / second / centimeter**2
 
     _interp_data: tuple[Tensor, Tensor]
     _interpolate = Linear1dInterpolated._interpolate.__func__
@@ -61,22 +127,34 @@ class InterpolatedSpectralMagSys(Linear1dInterpolated, SpectralMagSys):
     def __repr__(self):
         return f'{type(self).__name__}[{self.name}]'
 
+    @cached_property
+    def _cache_key(self) -> str:
+        return fingerprint(type(self).__name__, self._interp_data)
+
     def f0_wave(self, wave):
         return self._interpolate(wave.to(self._wave_unit).value) * self._flux_unit
 
 
+# magnitude systems are loaded on first access (see `__getattr__`), some by an alias
+_aliases = {'Vega': 'alpha_lyr_mod_001'}
+
+
 def __getattr__(name):
-    from ..utils import datadir
+    from ..utils import datadir, load_data
+
+    if name in _aliases:
+        res = globals()[name] = __getattr__(_aliases[name])
+        return res
 
     fname = (datadir / 'magsys' / name).with_suffix('.pt')
     if fname.is_file():
-        res = globals()[name] = InterpolatedSpectralMagSys(name, *phytorchx.load(fname))
+        res = globals()[name] = InterpolatedSpectralMagSys(name, *load_data(fname))
         return res
 
     raise AttributeError(name)
 
 
-Vega: InterpolatedSpectralMagSys = __getattr__('alpha_lyr_mod_001')
+Vega: InterpolatedSpectralMagSys
 BD17: InterpolatedSpectralMagSys
 
 
@@ -115,12 +193,33 @@ class CompositeMagSys(MagSys):
         magsys, offset = self.bands[band]
         return 10**(0.4*offset) * magsys.zp_counts(band)
 
+    def _zp_many(self, bands: Sequence[Bandpass], name: str):
+        # one batched call per underlying magnitude system
+        groups: dict[MagSys, list[int]] = {}
+        for i, band in enumerate(bands):
+            groups.setdefault(self.bands[band].magsys, []).append(i)
+
+        zps = [getattr(magsys, name)([bands[i] for i in idx]) for magsys, idx in groups.items()]
+        zps = torch.cat([zp.to(zps[0].unit).value for zp in zps]) * zps[0].unit
+
+        order = [i for idx in groups.values() for i in idx]
+        offsets = torch.tensor([self.bands[bands[i]].zp for i in order], dtype=zps.dtype, device=zps.device)
+        order = torch.tensor(order, device=zps.device)
+        return (10**(0.4*offsets) * zps)[torch.argsort(order)]
+
+    def zp_flux_many(self, bands: Sequence[Bandpass]):
+        return self._zp_many(bands, 'zp_flux_many')
+
+    def zp_counts_many(self, bands: Sequence[Bandpass]):
+        return self._zp_many(bands, 'zp_counts_many')
+
 
 @cache
 def CSPMagSys_K17():
     from . import cspk17_r, cspk17_u, cspk17_g, cspk17_i, cspk17_B, cspk17_V0, cspk17_V1, cspk17_V, cspk17_Y, cspk17_J, cspk17_Jrc2, cspk17_H, cspk17_Ydw, cspk17_Jdw, cspk17_Hdw
 
     BD17 = globals()['BD17'] if 'BD17' in globals() else __getattr__('BD17')
+    Vega = globals()['Vega'] if 'Vega' in globals() else __getattr__('Vega')
 
     return CompositeMagSys('CSPMagSys_K17', {
         cspk17_u: CompositeMagSys.BandZP(BD17, 10.518),
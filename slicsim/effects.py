@@ -1,16 +1,15 @@
 import inspect
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import cache
 from inspect import signature
 from math import pi
-
-import forge
-
-from feign import copy_function, feign
+from typing import TYPE_CHECKING
 
 from .sources.abc import Source
 from .extinction import Extinction
-from .utils import _t
+from .profiling import stage
+from .utils import _t, ArgsMemo
 from .utils.utility_base import UtilityBase
 
 
@@ -24,12 +23,18 @@ class AffectedSource(Source, ABC):
 
     def __post_init__(self):
         return
+        import forge
+        from feign import copy_function, feign
+
         self.__call__ = feign(copy_function(self.__call__), inspect.signature(forge.insert((
             forge.kwarg(name, default=param.default, type=param.annotation)
             for name, param in signature(self.base).parameters.items()
             if param.kind is param.KEYWORD_ONLY
         ), index=-1)(self.__call__)))
 
+    # not copied when converting to another dtype or device (see `utils.migrate`)
+    _transient_attrs = ('_memo',)
+
     # TODO: Serialize this!
 
     def __getstate__(self):
@@ -39,10 +44,20 @@ class AffectedSource(Source, ABC):
         self.base = state['base']
         self.__post_init__()
 
+    @stage('effects')
+    def __call__(self, phase: _t, wave: _t, **kwargs):
+        self.set_params(**kwargs)
+        return self.flux(phase, wave, **kwargs)
+
     @abstractmethod
     def flux(self, phase: _t, wave: _t, **kwargs) -> _t:
         return self.base(phase, wave, **kwargs)
 
+    def _memoised(self, func, *args):
+        # Returning the same transformed (phase, wave) while the inputs and
+        # parameters are unchanged lets the base reuse its interpolation plan.
+        return self.__dict__.setdefault('_memo', ArgsMemo())(func, *args)
+
 
 def affected(source: Source, *effects: AffectedSource):
     for effect in effects:
@@ -56,7 +71,7 @@ class Phaseshifted(AffectedSource):
     phase0: _t = 0
 
     def flux(self, phase: _t, wave: _t, **kwargs) -> _t:
-        return super().flux(phase - self.phase0, wave, **kwargs)
+        return super().flux(self._memoised(lambda p, phase0: p - phase0, phase, self.phase0), wave, **kwargs)
 
 
 @dataclass(kw_only=True)
@@ -68,7 +83,8 @@ class Redshifted(AffectedSource):
         return 1 / (1+self.z)
 
     def flux(self, phase: _t, wave: _t, **kwargs) -> _t:
-        return (a := self.scale_factor)**3 * super().flux(a*phase, a*wave, **kwargs)
+        a = self.scale_factor
+        return a**3 * super().flux(*self._memoised(lambda p, w, z: (a*p, a*w), phase, wave, self.z), **kwargs)
 
 
 @dataclass(kw_only=True)
@@ -81,18 +97,47 @@ class Extincted(AffectedSource):
 
 
 class Distance(AffectedSource):
-    from phytorch.units.astro import pc
+    @staticmethod
+    @cache
+    def default_distance():
+        from phytorch.units.astro import pc
 
-    def flux(self, phase: _t, wave: _t, distance=10*pc, **kwargs):
-        return super().flux(phase, wave, **kwargs) / (4*pi * distance**2)
+        return 10*pc
 
+    def get_distance(self, distance=None, **kwargs):
+        return self.default_distance() if distance is None else distance
 
-@dataclass(kw_only=True)
-class CosmologicalDistance(Distance):
+    def flux(self, phase: _t, wave: _t, distance=None, **kwargs):
+        return super().flux(phase, wave, **kwargs) / (4*pi * self.get_distance(distance)**2)
+
+
+def _cosmological_distance():
     from phytorch.cosmology.core import FLRW
 
-    cosmo: UtilityBase.private(FLRW)
-    z_cosmo: _t = 0
+    @dataclass(kw_only=True)
+    class CosmologicalDistance(Distance):
+        cosmo: UtilityBase.private(FLRW)
+        z_cosmo: _t = 0
 
-    def flux(self, phase: _t, wave: _t, **kwargs) -> _t:
-        return super().flux(phase, wave, self.cosmo.comoving_transverse_distance(self.z_cosmo), **kwargs)
+        def get_distance(self, **kwargs):
+            return self.cosmo.comoving_transverse_distance(self.z_cosmo)
+
+        def flux(self, phase: _t, wave: _t, **kwargs) -> _t:
+            return super().flux(phase, wave, self.cosmo.comoving_transverse_distance(self.z_cosmo), **kwargs)
+
+    # picklable by reference, as a module-level class
+    CosmologicalDistance.__qualname__ = CosmologicalDistance.__name__
+    return CosmologicalDistance
+
+
+if TYPE_CHECKING:
+    CosmologicalDistance = _cosmological_distance()
+
+
+def __getattr__(name):
+    # `CosmologicalDistance` is only defined on first access, since importing
+    # phytorch's cosmology (for its annotations) is slow
+    if name == 'CosmologicalDistance':
+        res = globals()[name] = _cosmological_distance()
+        return res
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
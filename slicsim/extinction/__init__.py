@@ -30,7 +30,13 @@ class InterpolatedExtinction(Interpolated, Extinction, ABC):
             setattr(cls, cls._mag_or_linear.__name__, cls._interpolate)
 
 
-class FM07(DelayedLinear1dInterpolated, InterpolatedExtinction):
+class DelayedLinear1dInterpolatedExtinction(DelayedLinear1dInterpolated, InterpolatedExtinction):
+    # class-level data, so both representations are available on the class
+    mag = classmethod(Extinction.mag)
+    linear = classmethod(Extinction.linear)
+
+
+class FM07(DelayedLinear1dInterpolatedExtinction):
     _delayed_data_func = DataRegistry.extinction_FM07
 
 
@@ -0,0 +1,119 @@
+"""Evaluation of light-curve models without side effects.
+
+`Source.__call__` sets the parameters on the source (and, through
+`AffectedSource`, on every source it wraps), and sources cache interpolation
+plans and transformed inputs on themselves. `evaluate` instead calls a
+fresh copy of the source chain (see `fresh`) on the precomputed evaluation
+points of the field, so the model and its source are never modified. It is
+therefore safe to use concurrently (e.g. from several threads) and under
+`torch.func` transforms::
+
+    names = ('z', 'phase0', 'x_1', 'c')
+    fluxes = torch.func.vmap(lambda p: evaluate(model, p, names=names))(packed)
+    jac = torch.func.vmap(torch.func.jacrev(lambda p: evaluate(model, p, names=names)))(packed)
+
+for a ``packed`` tensor of shape ``[N, 4]`` (see `unpack`), which give the
+band fluxes ``[N, N_obs]`` and their Jacobians ``[N, N_obs, 4]`` for ``N``
+samples of the parameters.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence, TypeVar, Union
+
+import torch
+from torch import Tensor
+
+from .model import _value_unit, LightcurveModel
+from .sources.abc import Source
+
+
+_SourceT = TypeVar('_SourceT', bound=Source)
+_namesT = Sequence[Union[str, tuple[str, int]]]
+
+
+def fresh(source: _SourceT) -> _SourceT:
+    """A copy of ``source``, and of the sources it wraps, without cached
+    (transient) state, so that calling it modifies only the copies."""
+    ret = object.__new__(type(source))
+    transient = {name for klass in type(source).__mro__ for name in vars(klass).get('_transient_attrs', ())}
+    ret.__dict__.update(
+        (key, fresh(val) if isinstance(val, Source) else val)
+        for key, val in vars(source).items() if key not in transient
+    )
+    return ret
+
+
+def unpack(packed: Tensor, names: _namesT) -> Mapping[str, Tensor]:
+    """Named parameters from the columns of ``packed`` (along its last
+    dimension).
+
+    Each name is either a string, for a single column (which is taken
+    without the last dimension), or a tuple ``(name, width)`` for a
+    parameter spanning ``width`` columns (taken as ``[..., width]``, e.g.
+    the ``coeffs`` of a PCA source).
+    """
+    widths = [1 if isinstance(name, str) else name[1] for name in names]
+    if sum(widths) != packed.shape[-1]:
+        raise ValueError(f'The names span {sum(widths)} columns, but the packed parameters have {packed.shape[-1]}.')
+
+    ret, i = {}, 0
+    for name, width in zip(names, widths):
+        if isinstance(name, str):
+            ret[name] = packed[..., i]
+        else:
+            ret[name[0]] = packed[..., i:i+width]
+        i += width
+    return ret
+
+
+def evaluate(model: LightcurveModel, params: Union[Mapping[str, Any], Tensor],
+             method: str = 'bandcountscal', names: _namesT = None) -> Tensor:
+    """Evaluate a calibrated method of ``model`` without modifying it.
+
+    The results are those of the unit-free path of the model (see
+    `LightcurveModel.unitless`), as bare tensors.
+
+    Parameters
+    ----------
+    model
+        the model to evaluate; it must not use a band table
+    params
+        the parameters, as a mapping of names to values (the keyword
+        arguments of ``method``), or a tensor of packed parameters, which is
+        `unpack`-ed with ``names``
+    method
+        ``'bandcountscal'`` or ``'bandfluxcal'``
+    names
+        the names of the columns of packed ``params``
+    """
+    if method not in ('bandcountscal', 'bandfluxcal'):
+        raise ValueError(f'Cannot evaluate {method}, only bandcountscal and bandfluxcal.')
+    if model.table is not None:
+        raise ValueError('Functional evaluation cannot use a band table.')
+    counts = method == 'bandcountscal'
+
+    if not isinstance(params, Mapping):
+        if names is None:
+            raise ValueError('Packed parameters require the names of their columns.')
+        params = unpack(params, names)
+
+    # The evaluation points, integration weights and zero points do not
+    # depend on the parameters, so they are computed (and cached) outside of
+    # any active `torch.func` transform.
+    with torch._C._DisableFuncTorch():
+        field = model.field.cache()
+        evp, acc = field._evaluation_points, model._accumulation()
+        acc.field.cache()
+        evp.source_inputs, evp.point_obs
+
+    ret = fresh(model.source)(*evp.source_inputs, **field._point_params(params))
+    ret, unit = _value_unit(ret)
+    units = model._units(unit)
+
+    t = model._accumulate(ret) * acc.trans_dwaves.value
+    t = evp.reduce_add_value(t / acc.energies.value if counts else t)
+    return (
+        t / acc.field.band_zpcounts.value * units.countscal if counts else
+        t / acc.field.band_zpfluxes.value * units.fluxcal
+    )
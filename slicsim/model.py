@@ -1,33 +1,101 @@
+from __future__ import annotations
+
+import dataclasses
+from contextlib import contextmanager
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Iterable, Mapping, Sequence, Union, cast
+from itertools import accumulate
+from math import pi
+from typing import Any, Callable, Iterable, Mapping, Sequence, TYPE_CHECKING, Union, cast
 
 import numpy as np
 import torch
-from more_itertools import bucket
 from torch import Tensor
-from typing_extensions import TypeAlias
-
-from phytorch.constants import c, h
-from phytorch.quantities import Quantity
-from phytorch.units import Unit
-from phytorch.units.si import angstrom, day
+from typing_extensions import Self, TypeAlias
 
 from .bandpasses.bandpass import Bandpass
 from .bandpasses.magsys import MagSys
+from .profiling import stage
 from .sources.abc import Source
-from .utils import _t
+from .utils import _t, is_tracing
+from .utils.diskcache import cached, get_cache
+from .utils.migrate import migrate
+
+if TYPE_CHECKING:
+    from phytorch.quantities import Quantity
+    from phytorch.units import Unit
+
+    from .tables import ComponentBandTable
 
 _times_T: TypeAlias = Sequence[Union[_t, '_times_T']]
 _bands_T: TypeAlias = Sequence[Union[Bandpass, '_bands_T']]
 
 
+def _value_unit(t) -> tuple[Tensor, Unit]:
+    # a result that may carry a unit (e.g. from a `Distance`), as a bare tensor and its unit
+    from phytorch.quantities import Quantity
+    from phytorch.units import Unit
+
+    return (t.value, t.unit) if isinstance(t, Quantity) else (t, Unit())
+
+
+def _flushes_denormals() -> bool:
+    return not (torch.tensor(1e-30, dtype=torch.float32) * 1e-10).item()
+
+
+@contextmanager
+def _keep_denormals():
+    # Loading inductor's kernels may enable flushing of subnormals (for the
+    # whole process), which breaks single-precision evaluation elsewhere.
+    flush = _flushes_denormals()
+    try:
+        yield
+    finally:
+        torch.set_flush_denormal(flush)
+
+
+class _CodedBands(Sequence[Bandpass]):
+    """The bands of observations as a table of bands and a code per
+    observation (see `Field.from_codes`), which are looked up only when
+    accessed."""
+
+    # for `numpy.ndim`, which would otherwise build an array of the bands
+    ndim = 1
+
+    def __init__(self, table: Sequence[Bandpass], codes: Tensor):
+        self.table, self.codes = table, codes
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self):
+        return map(self.table.__getitem__, self.codes.tolist())
+
+    def __getitem__(self, item):
+        codes = self.codes[item]
+        return self.table[int(codes)] if codes.ndim == 0 else [self.table[i] for i in codes.tolist()]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self)} observations in {len(self.table)} bands)'
+
+
 @dataclass
 class Field:
     times: _times_T
     bands: _bands_T
     magsys: MagSys
 
+    # If given, integrate over each band with a reduced quadrature
+    # (see `Bandpass.quadrature`) accurate to this relative tolerance.
+    quadrature_rtol: float = None
+
+    # Evaluate the source on dense per-band tiles of unique times
+    # (see `_tilesT`) instead of separately for each observation.
+    tiled: bool = False
+
+    # The dtype of the evaluation points, by default torch's default.
+    dtype: torch.dtype = None
+
     @dataclass
     class _evpT:
         sizes: Sequence[int]
@@ -40,24 +108,146 @@ class Field:
 
         @cached_property
         def energies(self):
+            from phytorch.constants import c, h
+
             return h * c / self.waves
 
+        @cached_property
+        def source_inputs(self) -> tuple[Tensor, Tensor]:
+            # the same tensors on every evaluation, so that interpolation plans are reused
+            from phytorch.units.si import angstrom, day
+
+            return self.times.to(day).value, self.waves.to(angstrom).value
+
         @cached_property
         def indptr(self):
             return torch.tensor([0] + [i for i in [0] for s in self.sizes for i in [i + s]],
                                 device=self.times.device)
 
-        def reduce_add(self, t):
+        @cached_property
+        def point_obs(self) -> Tensor:
+            return torch.repeat_interleave(torch.diff(self.indptr), output_size=int(self.indptr[-1]))
+
+        @stage('reduce', points=lambda ret, self, t: t.shape[-1])
+        def reduce_add_value(self, t: Tensor) -> Tensor:
+            if is_tracing():
+                # segment_csr is opaque to the compiler
+                return t.new_zeros((*t.shape[:-1], len(self.indptr)-1)).index_add(-1, self.point_obs, t)
+
             from torch_scatter import segment_csr
 
+            return segment_csr(t, self.indptr.view(*(t.ndim-1)*(1,), -1))
+
+        def reduce_add(self, t):
             # TODO: torch_scatter with units
-            return segment_csr(t.value, self.indptr.view(*(t.ndim-1)*(1,), -1)) * t.unit
+            return self.reduce_add_value(t.value) * t.unit
+
+        def chunks(self, points: int) -> Sequence[tuple[slice, 'Field._evpT']]:
+            """Split into runs of whole observations of (at least, unless
+            last) ``points`` evaluation points.
 
+            Returns the slice of the evaluation points of each run and its
+            evaluation points, which are cached per ``points``.
+            """
+            cached = self.__dict__.get('_chunks')
+            if cached is None or cached[0] != points:
+                bounds, n = [0], 0
+                for i, size in enumerate(self.sizes, 1):
+                    n += size
+                    if n >= points:
+                        bounds.append(i)
+                        n = 0
+                if len(bounds) == 1 or bounds[-1] != len(self.sizes):
+                    bounds.append(len(self.sizes))
+
+                indptr = [0, *accumulate(self.sizes)]
+                chunks = []
+                for start, stop in zip(bounds[:-1], bounds[1:]):
+                    sl = slice(indptr[start], indptr[stop])
+                    chunk = Field._evpT(self.sizes[start:stop], *(q[..., sl] for q in self))
+                    chunk.source_inputs = tuple(t[..., sl] for t in self.source_inputs)
+                    chunk.indptr = self.indptr[start:stop+1] - sl.start
+                    chunks.append((sl, chunk))
+                cached = self.__dict__['_chunks'] = points, chunks
+            return cached[1]
+
+    @dataclass
+    class _tilesT(_evpT):
+        """Evaluation points laid out in per-band tiles.
+
+        The observations in each band are reduced to their unique times, and
+        the evaluation points of the band form a dense (row-major)
+        ``[N_unique_times, N_wave]`` tile. Results are reduced per tile and then
+        gathered back onto the observations through ``inverse``.
+        """
+
+        tiles: Sequence[tuple[int, int]]
+        inverse: Tensor
+
+        @stage('reduce', points=lambda ret, self, t: t.shape[-1])
+        def reduce_add_value(self, t: Tensor) -> Tensor:
+            return torch.cat([
+                tile.unflatten(-1, shape).sum(-1)
+                for tile, shape in zip(t.split([m*n for m, n in self.tiles], -1), self.tiles)
+            ], -1)[..., self.inverse]
+
+        def chunks(self, points: int):
+            raise ValueError('Chunked evaluation cannot be used with a tiled field.')
+
+
+    @property
+    def _dtype(self) -> torch.dtype:
+        return torch.get_default_dtype() if self.dtype is None else self.dtype
+
+    def to(self, dtype: torch.dtype = None, device: Union[str, torch.device] = None, memo: dict = None) -> Self:
+        """A copy with the times, bands and magnitude system in ``dtype``
+        (if floating point) and on ``device`` (see `utils.migrate`)."""
+        memo = {} if memo is None else memo
+        ret = migrate(self, dtype, device, memo)
+        ret.dtype = self.dtype if dtype is None else dtype
+        ret.times = torch.as_tensor(ret.times, dtype=ret._dtype, device=device)
+        if '_band_table_codes' in self.__dict__:
+            ret._band_table_codes = migrate(self._band_table_codes, dtype, device, memo)
+        return ret
+
+    def _band_nodes(self, band: Bandpass) -> tuple[Tensor, Tensor]:
+        return (band.wave, band.trans_dwave) if self.quadrature_rtol is None else band.quadrature(self.quadrature_rtol)
+
+    @classmethod
+    def from_codes(cls, times: _times_T, band_table: Sequence[Bandpass], codes: Tensor, magsys: MagSys, **kwargs):
+        """Construct a field from a table of (unique) bands and an integer band code per observation."""
+        codes = torch.as_tensor(codes, dtype=torch.long)
+
+        index = {}
+        codes = torch.tensor([index.setdefault(b, len(index)) for b in band_table], dtype=torch.long)[codes]
+
+        table = list(index)
+        self = cls(times, _CodedBands(table, codes), magsys, **kwargs)
+        self._band_table_codes = table, codes
+        return self
 
     @cached_property
+    @stage('evaluation_points', points=lambda ret, self: ret.times.shape[-1])
     def _evaluation_points(self):
+        # only fields with 1-dimensional bands are cached on disk (see `utils.diskcache`)
+        if get_cache() is None or not len(self.bands) or not isinstance(self.bands[0], Bandpass):
+            return self._compute_evaluation_points()
+        return cached(
+            self._compute_evaluation_points, 'evaluation_points', self.tiled, self.quadrature_rtol,
+            torch.as_tensor(self.times, dtype=self._dtype),
+            [band._cache_key for band in self.band_table], self.band_codes)
+
+    def _compute_evaluation_points(self):
+        from phytorch.quantities import Quantity
+        from phytorch.units.si import angstrom, day
+
+        if self.tiled:
+            return self._tiled_evaluation_points()
+        if not len(self.bands) or isinstance(self.bands[0], Bandpass):
+            return self._gathered_evaluation_points()
+
         waves, trans_dwaves = np.vectorize(
-            lambda b: (b.wave, b.trans_dwave), otypes=(object, object))(self.bands)
+            self._band_nodes, otypes=(object, object))(self.bands)
         sizes = tuple(map(len, waves[(waves.ndim - 1) * (0,)]))
         waves, trans_dwaves = (
             torch.stack(tuple(a.flat), 0).reshape(a.shape + (-1,))
@@ -69,60 +259,484 @@ class Field:
         return self._evpT(sizes, *(
             Quantity(t, unit=u) if not isinstance(t, Quantity) else t
             for t, u in zip((
-                torch.atleast_1d(torch.as_tensor(self.times, dtype=torch.get_default_dtype())).repeat_interleave(torch.tensor(sizes), dim=-1),
+                torch.atleast_1d(torch.as_tensor(self.times, dtype=self._dtype)).repeat_interleave(torch.tensor(sizes), dim=-1),
                 waves, trans_dwaves
             ), (day, angstrom, angstrom))))
 
+    def _gathered_evaluation_points(self):
+        # 1-dimensional bands: gather the nodes of each observation's band from
+        # the concatenated nodes of the unique bands
+        from phytorch.quantities import Quantity
+        from phytorch.units.si import angstrom, day
+
+        waves, trans_dwaves = (torch.cat(_, -1) for _ in zip(*map(self._band_nodes, self.band_table)))
+        table_sizes = torch.tensor([len(self._band_nodes(band)[0]) for band in self.band_table], dtype=torch.long)
+        table_indptr = torch.cat((table_sizes.new_zeros(1), table_sizes.cumsum(0)))
+
+        sizes = table_sizes[self.band_codes]
+        indptr = torch.cat((sizes.new_zeros(1), sizes.cumsum(0)))
+        npoints = int(indptr[-1])
+        idx = (
+            torch.arange(npoints)
+            + (table_indptr[self.band_codes] - indptr[:-1]).repeat_interleave(sizes, output_size=npoints)
+        ).to(waves.device)
+
+        ret = self._evpT(sizes.tolist(), *(
+            Quantity(t, unit=u) if not isinstance(t, Quantity) else t
+            for t, u in zip((
+                torch.atleast_1d(torch.as_tensor(self.times, dtype=self._dtype)).repeat_interleave(
+                    sizes.to(waves.device), dim=-1, output_size=npoints),
+                waves[idx], trans_dwaves[idx]
+            ), (day, angstrom, angstrom))))
+        ret.indptr = indptr.to(waves.device)
+        return ret
+
+    def _tiled_evaluation_points(self):
+        from phytorch.quantities import Quantity
+        from phytorch.units.si import angstrom, day
+
+        times = torch.as_tensor(self.times, dtype=self._dtype)
+        if times.ndim != 1 or np.ndim(self.bands) != 1:
+            raise ValueError('Tiled evaluation requires 1-dimensional times and bands.')
+
+        inverse = torch.empty(len(times), dtype=torch.long, device=times.device)
+        tiles, tile_times, tile_waves, tile_trans_dwaves = [], [], [], []
+        for band, idx in self.band_indices.items():
+            idx = torch.tensor(idx, device=times.device)
+            utimes, inv = torch.unique(times[idx], return_inverse=True)
+            wave, trans_dwave = self._band_nodes(band)
+
+            inverse[idx] = sum(m for m, n in tiles) + inv
+            tiles.append((len(utimes), len(wave)))
+            tile_times.append(utimes.repeat_interleave(len(wave)))
+            tile_waves.append(wave.repeat(len(utimes)))
+            tile_trans_dwaves.append(trans_dwave.repeat(len(utimes)))
+
+        return self._tilesT(
+            [n for m, n in tiles for _ in range(m)], *(
+                Quantity(torch.cat(t), unit=u)
+                for t, u in zip((tile_times, tile_waves, tile_trans_dwaves), (day, angstrom, angstrom))
+            ), tiles=tiles, inverse=inverse)
+
+    @cached_property
+    def _band_table_codes(self) -> tuple[Sequence[Bandpass], Tensor]:
+        index = {}
+        codes = torch.tensor([index.setdefault(b, len(index)) for b in self.bands], dtype=torch.long)
+        return list(index), codes
+
+    @property
+    def band_table(self) -> Sequence[Bandpass]:
+        """The unique bands, in order of first appearance."""
+        return self._band_table_codes[0]
+
+    @property
+    def band_codes(self) -> Tensor:
+        """Index of each observation's band in `band_table`."""
+        return self._band_table_codes[1]
+
     @cached_property
     def band_indices(self) -> Mapping[Bandpass, Sequence[int]]:
-        return dict(zip(b := bucket(range(len(self.bands)), lambda i: self.bands[i]), (list(b[key]) for key in b)))
+        return dict(zip(self.band_table, (
+            idx.tolist() for idx in torch.argsort(self.band_codes, stable=True).split(
+                torch.bincount(self.band_codes, minlength=len(self.band_table)).tolist())
+        )))
 
     @cached_property
+    @stage('zeropoints')
     def band_zpfluxes(self) -> Quantity:
-        return cast(Quantity, torch.stack([self.magsys.zp_flux(b) for b in self.bands]))
+        return cast('Quantity', self.magsys.zp_flux_many(self.band_table)[self.band_codes])
 
     @cached_property
+    @stage('zeropoints')
     def band_zpcounts(self) -> Quantity:
-        return cast(Quantity, torch.stack([self.magsys.zp_counts(b) for b in self.bands]))
+        return cast('Quantity', self.magsys.zp_counts_many(self.band_table)[self.band_codes])
+
+    def _point_params(self, kwargs: Mapping[str, Any], points: slice = slice(None)) -> Mapping[str, Any]:
+        return kwargs
+
+    def _obs_params(self, kwargs: Mapping[str, Any]) -> Mapping[str, Any]:
+        return kwargs
 
     def cache(self, clear=False):
         if clear:
             del self._evaluation_points
+            del self._band_table_codes
             del self.band_indices
             del self.band_zpfluxes
             del self.band_zpcounts
         self._evaluation_points
+        self._band_table_codes
         self.band_indices
         self.band_zpfluxes
         self.band_zpcounts
         return self
 
 
+@dataclass(kw_only=True)
+class FieldBatch(Field):
+    """Observations of many objects, stored flat.
+
+    ``times`` and ``bands`` are the concatenated (1-dimensional) observations
+    of all objects, and ``nobs`` is the number of observations of each object,
+    so that the observations of object ``i`` are
+    ``obs_indptr[i]:obs_indptr[i+1]`` (CSR offsets over the observations,
+    which in turn index the evaluation points through
+    ``_evaluation_points.indptr``).
+
+    Tensor parameters passed to a `LightcurveModel` evaluated on a
+    `FieldBatch` are interpreted as having shape ``[N_objects, ...]`` and are
+    gathered onto the evaluation points of each object. Scalars and tensors
+    of shape ``[1, ...]`` apply to all objects; other shapes are an error. Results are flat
+    (ragged) tensors of shape ``[..., N_obs]``: use `split` or `pad` to
+    separate the objects.
+    """
+
+    nobs: Sequence[int]
+
+    @classmethod
+    def from_fields(cls, fields: Sequence[Field], magsys: MagSys = None, **kwargs):
+        return cls(
+            times=torch.cat([torch.atleast_1d(torch.as_tensor(f.times, dtype=f._dtype)) for f in fields]),
+            bands=[b for f in fields for b in f.bands],
+            magsys=fields[0].magsys if magsys is None else magsys,
+            nobs=[len(f.bands) for f in fields], **kwargs
+        )
+
+    @property
+    def nobjects(self) -> int:
+        return len(self.nobs)
+
+    @cached_property
+    def obs_indptr(self) -> Tensor:
+        return torch.tensor([0, *accumulate(self.nobs)], device=self._evaluation_points.times.device)
+
+    @cached_property
+    def obs_objects(self) -> Tensor:
+        return torch.repeat_interleave(torch.tensor(self.nobs, device=self.obs_indptr.device))
+
+    @cached_property
+    def point_objects(self) -> Tensor:
+        if self.tiled:
+            raise ValueError('Tiled evaluation cannot be used with a FieldBatch.')
+        return self.obs_objects.repeat_interleave(
+            torch.tensor(self._evaluation_points.sizes, device=self.obs_indptr.device))
+
+    def _gather_params(self, kwargs: Mapping[str, Any], index: Tensor) -> Mapping[str, Any]:
+        ret = {}
+        for key, val in kwargs.items():
+            if torch.is_tensor(val) and val.ndim:
+                if val.shape[0] not in (1, self.nobjects):
+                    raise ValueError(
+                        f'Parameter {key} has shape {tuple(val.shape)}, but tensor parameters on a FieldBatch'
+                        f' must be scalars or have a leading dimension of N_objects={self.nobjects} (or 1).')
+                val = val.expand(self.nobjects, *val.shape[1:])[index]
+            ret[key] = val
+        return ret
+
+    def _point_params(self, kwargs: Mapping[str, Any], points: slice = slice(None)) -> Mapping[str, Any]:
+        return self._gather_params(kwargs, self.point_objects[points])
+
+    def _obs_params(self, kwargs: Mapping[str, Any]) -> Mapping[str, Any]:
+        return self._gather_params(kwargs, self.obs_objects)
+
+    def split(self, t: Tensor) -> Sequence[Tensor]:
+        return t.split(list(self.nobs), -1)
+
+    def pad(self, t: Tensor, fill_value=float('nan')) -> tuple[Tensor, Tensor]:
+        """Scatter a flat ``[..., N_obs]`` result into ``[..., N_objects, max(nobs)]``.
+
+        Returns the padded tensor and a boolean mask of valid entries.
+        """
+        idx = self.obs_objects, torch.arange(len(self.obs_objects), device=self.obs_indptr.device) - self.obs_indptr[self.obs_objects]
+        shape = self.nobjects, max(self.nobs, default=0)
+
+        mask = torch.zeros(shape, dtype=torch.bool, device=t.device)
+        mask[idx] = True
+        res = t.new_full((*t.shape[:-1], *shape), fill_value)
+        res[(..., *idx)] = t
+        return res, mask
+
+    def cache(self, clear=False):
+        if clear:
+            for key in ('obs_indptr', 'obs_objects', 'point_objects'):
+                self.__dict__.pop(key, None)
+        super().cache(clear)
+        self.point_objects
+        return self
+
 
 @dataclass
 class LightcurveModel:
     source: Source
     field: Field
 
+    # If given, band fluxes are interpolated from a precomputed table
+    # instead of integrated.
+    table: 'ComponentBandTable' = None
+
+    # Integrate on bare tensors, with the units of the results and the
+    # conversion factors of the calibrated results resolved once (see `_units`).
+    unitless: bool = False
+
+    # If given (e.g. ``torch.float64``), band integrals and zero points are
+    # accumulated (and the results returned) in this dtype, while the source
+    # is still evaluated in that of the field (see `mixed_precision`).
+    accumulate_dtype: torch.dtype = None
+
+    # If given, band integrals are computed in chunks of (about) this many
+    # evaluation points, whose intermediates are recomputed in the backward
+    # pass instead of being kept for autograd (see `_checkpointed_value`).
+    # Like `unitless`, this integrates on bare tensors.
+    checkpoint_points: int = None
+
+    def to(self, dtype: torch.dtype = None, device: Union[str, torch.device] = None) -> Self:
+        """A copy of the model (its source, with class-level template data,
+        field and table) in ``dtype`` and on ``device``.
+
+        Floating-point tensors are converted to ``dtype`` and all tensors are
+        moved to ``device``. The converted class-level data (e.g. templates,
+        colour laws) and module-level bandpasses and magnitude systems are
+        cached per dtype and device, so they are converted once for all
+        models (see `utils.migrate`). Parameters must be passed to the copy
+        in the same dtype and device.
+        """
+        memo = {}
+        return dataclasses.replace(
+            self, source=migrate(self.source, dtype, device, memo),
+            field=self.field.to(dtype, device, memo), table=migrate(self.table, dtype, device, memo))
+
+    def mixed_precision(self, compute: torch.dtype = torch.float32, accumulate: torch.dtype = torch.float64) -> Self:
+        """A copy that evaluates the source and effects in ``compute`` and
+        accumulates band integrals and zero points in ``accumulate``.
+
+        See `precision.compare` for the resulting accuracy.
+        """
+        return dataclasses.replace(self.to(compute), accumulate_dtype=accumulate)
+
+    @dataclass
+    class _accumulationT:
+        trans_dwaves: Quantity
+        energies: Quantity
+        field: Field  # for the zero points
+
+    def _accumulation(self) -> _accumulationT:
+        # The integration weights and zero points in `accumulate_dtype`, for
+        # the current evaluation points of the field.
+        evp = self.field._evaluation_points
+        cached = self.__dict__.get('_accumulation_cache')
+        if cached is None or cached[0] is not evp:
+            cached = self.__dict__['_accumulation_cache'] = evp, (
+                self._accumulationT(evp.trans_dwaves, evp.energies, self.field) if self.accumulate_dtype is None else
+                self._accumulationT(*(q.to(dtype=self.accumulate_dtype) for q in (evp.trans_dwaves, evp.energies)),
+                                    self.field.to(self.accumulate_dtype))
+            )
+        return cached[1]
+
+    def _accumulate(self, t: Tensor) -> Tensor:
+        return t if self.accumulate_dtype is None else t.to(dtype=self.accumulate_dtype)
+
+    @dataclass
+    class _unitsT:
+        flux: Unit
+        counts: Unit
+        fluxcal: float
+        countscal: float
+
+    def _units(self, unit: Unit) -> _unitsT:
+        # The source output may carry a unit (e.g. from a `Distance`) which can
+        # depend on the parameters, so it is part of the cache key.
+        cached = self.__dict__.get('_units_cache')
+        if cached is None or not cached[0] == unit:
+            from phytorch.units import Unit
+
+            evp = self.field._evaluation_points
+            flux = unit * self.source.flux_unit * evp.trans_dwaves.unit
+            counts = flux / evp.energies.unit
+            cached = self.__dict__['_units_cache'] = unit, self._unitsT(flux, counts, *(
+                float((u / zp.unit).to(Unit()))
+                for u, zp in ((flux, self.field.band_zpfluxes), (counts, self.field.band_zpcounts))
+            ))
+        return cached[1]
+
+    @stage('source', points=lambda ret, self, **kwargs: ret[0].shape[-1])
+    def _evaluate_points_value(self, **kwargs) -> tuple[Tensor, _unitsT]:
+        evp = self.field._evaluation_points
+        ret = self.source(*evp.source_inputs, **self.field._point_params(kwargs))
+        ret, unit = _value_unit(ret)
+        return self._accumulate(ret) * self._accumulation().trans_dwaves.value, self._units(unit)
+
+    def _checkpointed_value(self, counts: bool, **kwargs) -> tuple[Tensor, _unitsT]:
+        # Each chunk of evaluation points is integrated in a checkpoint
+        # (`torch.utils.checkpoint`), which keeps for the backward pass only
+        # the parameters and the chunk's per-observation results, and
+        # recomputes the source, effects and reduction one chunk at a time.
+        # Peak memory is thus proportional to the number of observations
+        # (plus a single chunk) rather than the number of evaluation points.
+        from torch.utils.checkpoint import checkpoint
+
+        acc = self._accumulation()
+        trans_dwaves, energies = acc.trans_dwaves.value, acc.energies.value
+        units = []
+
+        def integrate(points: slice, chunk: Field._evpT) -> Tensor:
+            ret = self.source(*chunk.source_inputs, **self.field._point_params(kwargs, points))
+            ret, unit = _value_unit(ret)
+            units.append(unit)
+            t = self._accumulate(ret) * trans_dwaves[..., points]
+            return chunk.reduce_add_value(t / energies[..., points] if counts else t)
+
+        grad = torch.is_grad_enabled()
+        ret = torch.cat([
+            checkpoint(integrate, points, chunk, use_reentrant=False) if grad else integrate(points, chunk)
+            for points, chunk in self.field._evaluation_points.chunks(self.checkpoint_points)
+        ], -1)
+        return ret, self._units(units[0])
+
+    def _bandflux_value(self, **kwargs) -> tuple[Tensor, _unitsT]:
+        if self.checkpoint_points is not None:
+            return self._checkpointed_value(False, **kwargs)
+        t, units = self._evaluate_points_value(**kwargs)
+        return self.field._evaluation_points.reduce_add_value(t), units
+
+    def _bandcounts_value(self, **kwargs) -> tuple[Tensor, _unitsT]:
+        if self.checkpoint_points is not None:
+            return self._checkpointed_value(True, **kwargs)
+        evp = self.field._evaluation_points
+        t, units = self._evaluate_points_value(**kwargs)
+        return evp.reduce_add_value(t / self._accumulation().energies.value), units
+
+    def compile(self, method: str = 'bandcountscal', **kwargs) -> Callable[..., Tensor]:
+        """Compile a calibrated evaluation method into a single graph.
+
+        The source with its effects, the band integration, and the division by
+        the zero points are traced (with `make_fx`) on bare tensors into a
+        graph of ATen operations, which is then compiled with `torch.compile`.
+        Outer `Distance` effects, which usually involve `Quantity`'s (and those
+        cannot be traced), are applied afterwards.
+
+        Graphs are specialised to the field and to the names, shapes, and
+        dtypes of the parameters (numbers are converted to tensors), and are
+        retraced when these change. Control flow that depends on parameter
+        values (rather than shapes) is frozen at tracing.
+
+        Parameters
+        ----------
+        method
+            ``'bandcountscal'`` or ``'bandfluxcal'``
+        kwargs
+            passed on to `torch.compile`
+
+        Returns
+        -------
+        A function that takes the same parameters as ``method``. Parameters
+        that are `Quantity`'s are only passed to the outer `Distance` effects.
+        """
+        from torch.fx.experimental.proxy_tensor import make_fx
+        from phytorch.quantities import Quantity
+        from phytorch.units import Unit
+
+        from .effects import Distance
+
+        if method not in ('bandcountscal', 'bandfluxcal'):
+            raise ValueError(f'Cannot compile {method}, only bandcountscal and bandfluxcal.')
+        counts = method == 'bandcountscal'
+
+        distances, source = [], self.source
+        while isinstance(source, Distance):
+            distances.append(source)
+            source = source.base
+
+        field = self.field.cache()
+        evp = field._evaluation_points
+        evp.point_obs
+        acc = self._accumulation()
+        inputs, trans_dwaves, energies = evp.source_inputs, acc.trans_dwaves.value, acc.energies.value
+        zp = (acc.field.band_zpcounts if counts else acc.field.band_zpfluxes).value
+
+        def integrate(**kw) -> Tensor:
+            t = self._accumulate(source(*inputs, **field._point_params(kw))) * trans_dwaves
+            return evp.reduce_add_value(t / energies if counts else t) / zp
+
+        graphs = {}
+
+        def evaluate(**kw) -> Tensor:
+            obs_kw = field._obs_params(kw)
+            scale = 1
+            for d in distances:
+                d.set_params(**obs_kw)
+                scale = scale / (4*pi * d.get_distance(**obs_kw)**2)
+            scale, unit = (
+                (1, scale) if isinstance(scale, Unit) else
+                (scale.value, scale.unit) if isinstance(scale, Quantity) else
+                (scale, Unit())
+            )
+            units = self._units(unit)
+
+            kw = {
+                key: torch.as_tensor(val, dtype=evp.times.dtype) if isinstance(val, (int, float)) else val
+                for key, val in sorted(kw.items()) if not isinstance(val, Quantity)
+            }
+            tensors = {key: val for key, val in kw.items() if torch.is_tensor(val)}
+            guard = tuple(
+                (key, (val.shape, val.dtype, val.device)) if key in tensors else (key, val)
+                for key, val in kw.items()
+            )
+            with _keep_denormals():
+                if guard not in graphs:
+                    # run once eagerly, so that lazily loaded data is not traced
+                    integrate(**kw)
+                    graphs[guard] = torch.compile(make_fx(
+                        lambda *args: integrate(**dict(kw, **dict(zip(tensors.keys(), args))))
+                    )(*tensors.values()), dynamic=False, **kwargs)
+                ret = graphs[guard](*tensors.values())
+            return ret * scale * (units.countscal if counts else units.fluxcal)
+
+        return evaluate
+
+    @stage('source', points=lambda ret, self, **kwargs: ret.shape[-1])
     def _evaluate_points(self, **kwargs) -> Quantity:
-        times, waves, trans_dwaves = self.field._evaluation_points
+        evp = self.field._evaluation_points
         # TODO: figure out a way to do heterogeneous-unit interp
         return (
-            self.source(times.to(day).value, waves.to(angstrom).value, **kwargs)
+            self._accumulate(self.source(*evp.source_inputs, **self.field._point_params(kwargs)))
             * self.source.flux_unit
-            * trans_dwaves
+            * self._accumulation().trans_dwaves
         )
 
     def bandflux(self, **kwargs) -> Quantity:
+        from phytorch.quantities import Quantity
+
+        if self.table is not None:
+            return self.table.bandflux(self.source, self.field, **kwargs)
+        if self.unitless or self.checkpoint_points is not None:
+            t, units = self._bandflux_value(**kwargs)
+            return Quantity(t, unit=units.flux)
         return self.field._evaluation_points.reduce_add(self._evaluate_points(**kwargs))
 
     def bandfluxcal(self, **kwargs) -> Tensor:
-        return (self.bandcounts(**kwargs) / self.field.band_zpfluxes).to(Unit()).value
+        if (self.unitless or self.checkpoint_points is not None) and self.table is None:
+            t, units = self._bandflux_value(**kwargs)
+            return t / self._accumulation().field.band_zpfluxes.value * units.fluxcal
+        from phytorch.units import Unit
+
+        return (self.bandflux(**kwargs) / self._accumulation().field.band_zpfluxes).to(Unit()).value
 
     def bandcounts(self, **kwargs) -> Quantity:
+        from phytorch.quantities import Quantity
+
+        if self.table is not None:
+            return self.table.bandcounts(self.source, self.field, **kwargs)
+        if self.unitless or self.checkpoint_points is not None:
+            t, units = self._bandcounts_value(**kwargs)
+            return Quantity(t, unit=units.counts)
         return self.field._evaluation_points.reduce_add(
-            self._evaluate_points(**kwargs) / self.field._evaluation_points.energies
+            self._evaluate_points(**kwargs) / self._accumulation().energies
         )
 
     def bandcountscal(self, **kwargs) -> Tensor:
-        return (self.bandcounts(**kwargs) / self.field.band_zpcounts).to(Unit()).value
+        if (self.unitless or self.checkpoint_points is not None) and self.table is None:
+            t, units = self._bandcounts_value(**kwargs)
+            return t / self._accumulation().field.band_zpcounts.value * units.countscal
+        from phytorch.units import Unit
+
+        return (self.bandcounts(**kwargs) / self._accumulation().field.band_zpcounts).to(Unit()).value
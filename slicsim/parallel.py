@@ -0,0 +1,217 @@
+"""Parallel simulation in a pool of worker processes.
+
+`SimulationPool` evaluates a user-supplied ``simulate(generator, index)``
+function over batch indices in worker processes. Template data (see
+`Delayed`) loaded in the parent process and the tensors reachable from
+``simulate`` (e.g. a `LightcurveModel` with its bandpasses and magnitude
+system) are moved into shared memory once, so that workers do not hold
+copies of them.
+
+Each batch gets its own random number generator, seeded from the pool's seed
+and the batch index only (see `batch_generator`), so results do not depend
+on the number of workers or on the order in which batches are processed.
+"""
+
+from __future__ import annotations
+
+import sys
+from bisect import bisect_right
+from collections import deque
+from functools import partial
+from itertools import islice
+from types import FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, TypeVar, Union
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from .utils import Delayed
+
+
+_T = TypeVar('_T')
+
+
+def batch_seed(seed: int, index: int) -> int:
+    """A 64-bit seed for the ``index``-th batch, derived (with
+    `numpy.random.SeedSequence`) from the root ``seed``."""
+    return int(np.random.SeedSequence(seed, spawn_key=(index,)).generate_state(1, np.uint64)[0])
+
+
+def batch_generator(seed: int, index: int, device: Union[str, torch.device] = 'cpu') -> torch.Generator:
+    return torch.Generator(device).manual_seed(batch_seed(seed, index))
+
+
+def _file_mappings() -> list[tuple[int, int]]:
+    # address ranges of the file-backed memory mappings of the process (only known on Linux)
+    try:
+        with open('/proc/self/maps') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    return sorted(
+        tuple(int(address, 16) for address in fields[0].split('-'))
+        for fields in map(str.split, lines) if len(fields) >= 6 and fields[5].startswith('/')
+    )
+
+
+def share_memory(obj: _T) -> _T:
+    """Move all tensors reachable from ``obj`` (through containers, instance
+    attributes, `functools.partial` objects, bound methods, and the closures
+    and defaults of functions, but not module globals) into shared memory,
+    in place.
+
+    Tensors backed by a file (e.g. memory-mapped template data, see
+    `utils.load_data`) are left alone, since their pages are already shared
+    through the page cache, and moving them would copy them into memory.
+    """
+    seen, mappings = set(), _file_mappings()
+
+    def file_backed(t: Tensor) -> bool:
+        ptr = t.untyped_storage().data_ptr()
+        i = bisect_right(mappings, (ptr, float('inf'))) - 1
+        return i >= 0 and mappings[i][0] <= ptr < mappings[i][1]
+
+    def walk(o):
+        if id(o) in seen or isinstance(o, (type, ModuleType, str, bytes)):
+            return
+        seen.add(id(o))
+        if isinstance(o, FunctionType):
+            walk(tuple(cell.cell_contents for cell in o.__closure__ or ()))
+            walk(o.__defaults__)
+            walk(o.__kwdefaults__)
+        elif isinstance(o, partial):
+            walk((o.func, o.args, o.keywords))
+        elif isinstance(o, MethodType):
+            walk((o.__func__, o.__self__))
+        elif torch.is_tensor(o):
+            if o.device.type == 'cpu' and not o.is_shared() and not file_backed(o):
+                o.share_memory_()
+        elif isinstance(o, Mapping):
+            for val in o.values():
+                walk(val)
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            for val in o:
+                walk(val)
+        elif hasattr(o, '__dict__'):
+            walk(vars(o))
+
+    walk(obj)
+    return obj
+
+
+def _subclasses(cls: type) -> Iterator[type]:
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+def _importable(cls: type) -> bool:
+    obj = sys.modules.get(cls.__module__)
+    for name in cls.__qualname__.split('.'):
+        obj = getattr(obj, name, None)
+    return obj is cls
+
+
+def loaded_templates() -> Mapping[type, Any]:
+    """The data of all `Delayed` classes that has already been loaded."""
+    return {cls: cls.__dict__['_delayed_data'] for cls in _subclasses(Delayed) if '_delayed_data' in cls.__dict__}
+
+
+_worker: tuple[Callable[[torch.Generator, int], Any], int] = None
+
+
+def _init_worker(simulate, seed: int, threads: int, templates: Mapping[type, Any]):
+    global _worker
+    torch.set_num_threads(threads)
+    for cls, data in templates.items():
+        if '_delayed_data' not in cls.__dict__:
+            cls._delayed_data = data
+    _worker = simulate, seed
+
+
+def _run_batch(index: int):
+    simulate, seed = _worker
+    return simulate(batch_generator(seed, index), index)
+
+
+class SimulationPool:
+    """Evaluate ``simulate(generator, index)`` for many batches in parallel.
+
+    Parameters
+    ----------
+    simulate
+        called with a `torch.Generator` dedicated to the batch and the
+        batch's index; it should draw all random numbers from the generator
+        and return a (picklable) result, e.g. parameters and fluxes. It must
+        be picklable itself unless the ``'fork'`` start method is used, e.g.
+        a module-level function or a `functools.partial` of one with the
+        model: tensors that it reaches only through module globals are not
+        shared (see `share_memory`).
+    nworkers
+        the number of worker processes, by default one per core. With
+        ``nworkers=0``, batches are simulated in the calling process.
+    seed
+        the root seed of the batches' generators
+    threads
+        the number of `torch` threads in each worker
+    context
+        the `multiprocessing` start method, by default ``'fork'`` where
+        available. With ``'spawn'``, only the data of `Delayed` classes
+        importable by name is sent to the workers; the rest is loaded anew.
+
+    Load the templates (e.g. by evaluating the model once) before creating
+    the pool in order to share them.
+    """
+
+    def __init__(self, simulate: Callable[[torch.Generator, int], _T], nworkers: int = None,
+                 seed: int = 0, threads: int = 1, context: Optional[str] = None):
+        from concurrent.futures import ProcessPoolExecutor
+        import torch.multiprocessing as mp
+
+        self.simulate, self.seed = simulate, seed
+        self.nworkers = mp.cpu_count() if nworkers is None else nworkers
+
+        self.executor = None
+        if self.nworkers:
+            if context is None:
+                context = 'fork' if 'fork' in mp.get_all_start_methods() else 'spawn'
+            templates = share_memory(loaded_templates())
+            share_memory(simulate)
+            if context != 'fork':
+                templates = {cls: data for cls, data in templates.items() if _importable(cls)}
+            self.executor = ProcessPoolExecutor(
+                self.nworkers, mp_context=mp.get_context(context),
+                initializer=_init_worker, initargs=(simulate, seed, threads, templates))
+
+    def map(self, batches: Union[int, Iterable[int]], prefetch: int = 2) -> Iterator[_T]:
+        """Simulate the given batch indices (or ``range(batches)``) and yield
+        the results in order.
+
+        At most ``prefetch`` batches per worker are submitted ahead of the
+        one being yielded, so that ``batches`` can be long (or infinite). If
+        a worker dies (e.g. runs out of memory), a
+        `concurrent.futures.process.BrokenProcessPool` is raised.
+        """
+        batches = iter(range(batches) if isinstance(batches, int) else batches)
+        if self.executor is None:
+            for index in batches:
+                yield self.simulate(batch_generator(self.seed, index), index)
+            return
+
+        pending = deque(self.executor.submit(_run_batch, index) for index in islice(batches, prefetch * self.nworkers))
+        while pending:
+            ret = pending.popleft().result()
+            pending.extend(self.executor.submit(_run_batch, index) for index in islice(batches, 1))
+            yield ret
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
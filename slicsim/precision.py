@@ -0,0 +1,64 @@
+"""Accuracy of evaluating a `LightcurveModel` in reduced precision.
+
+`compare` evaluates a model in single precision, in mixed precision (see
+`LightcurveModel.mixed_precision`), and in double precision (everything,
+including the class-level template data, converted with
+`LightcurveModel.to`), and reports the largest magnitude differences of the
+former two from the latter.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+import torch
+from torch import Tensor
+
+from .model import LightcurveModel
+
+
+def _cast(kwargs: Mapping[str, Any], dtype: torch.dtype) -> Mapping[str, Any]:
+    return {
+        key: val.to(dtype) if torch.is_tensor(val) and val.is_floating_point() else val
+        for key, val in kwargs.items()
+    }
+
+
+def magnitude_error(fluxcal: Tensor, reference: Tensor, min_flux: float = 1e-2) -> Tensor:
+    """The largest ``|2.5 log10(fluxcal / reference)|`` over the last
+    dimension, considering only fluxes brighter than ``min_flux`` times the
+    brightest ``reference`` (i.e. within ``-2.5 log10(min_flux)`` magnitudes
+    of peak)."""
+    reference = reference.double()
+    mask = reference > min_flux * reference.amax(-1, keepdim=True)
+    err = 2.5 * torch.log10(fluxcal.double() / reference).abs()
+    return torch.where(mask, err, err.new_zeros(())).amax(-1)
+
+
+def compare(model: LightcurveModel, method: str = 'bandcountscal', min_flux: float = 1e-2,
+            **kwargs) -> Mapping[str, float]:
+    """The largest magnitude errors of ``method`` evaluated in single and
+    mixed precision with respect to double precision.
+
+    Parameters
+    ----------
+    model
+        the model to evaluate; it is converted to each precision with
+        `LightcurveModel.to` (and `LightcurveModel.mixed_precision`)
+    method
+        the (calibrated) evaluation method, ``'bandcountscal'`` or
+        ``'bandfluxcal'``
+    min_flux
+        see `magnitude_error`
+    kwargs
+        the parameters, converted to the precision of each evaluation
+
+    Returns
+    -------
+    The errors (in magnitudes) for ``'float32'`` and ``'mixed'``.
+    """
+    reference = getattr(model.to(torch.float64), method)(**_cast(kwargs, torch.float64))
+    return {
+        name: magnitude_error(getattr(m, method)(**_cast(kwargs, torch.float32)), reference, min_flux).max().item()
+        for name, m in (('float32', model.to(torch.float32)), ('mixed', model.mixed_precision()))
+    }
@@ -0,0 +1,192 @@
+"""Opt-in per-stage instrumentation of light-curve evaluation.
+
+Usage::
+
+    with slicsim.profile(memory=True) as p:
+        model.bandcountscal(**params)
+    print(p.table())
+    p.export_chrome_trace('trace.json')
+
+The stages are
+
+- ``evaluation_points``: building `Field._evaluation_points`;
+- ``source``: evaluating the source with its effects on the evaluation points;
+- ``effects``: applying the effects (`AffectedSource`) (within ``source``);
+- ``base_source``: evaluating the source that the effects wrap (within
+  ``effects``, or directly within ``source`` if there are none);
+- ``interpolation``: interpolating template grids (within ``base_source``);
+- ``reduce``: summing the evaluation points into observations;
+- ``zeropoints``: computing the zero points of the bands (once per `Field`).
+
+Stages can be nested, so both inclusive and self (exclusive) times are
+reported. A stage nested directly in itself (e.g. effects wrapping effects)
+is recorded once. Outside a `profile` context, instrumented functions only pay for a
+global lookup.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from functools import wraps
+from itertools import accumulate
+from os import PathLike
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Mapping, Optional, Sequence, TypeVar, Union
+
+
+_FuncT = TypeVar('_FuncT', bound=Callable)
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    start: int  # ns since the epoch
+    end: int = None
+    depth: int = 0
+    children: int = 0  # ns spent in nested stages
+    points: Optional[int] = None
+    peak_bytes: Optional[int] = None
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+
+@dataclass
+class Profile:
+    memory: bool = False
+
+    records: list[StageRecord] = field(default_factory=list)
+    _stack: list[StageRecord] = field(default_factory=list, repr=False)
+    _offset: int = field(default_factory=lambda: time.time_ns() - time.perf_counter_ns(), repr=False)
+
+    def _run(self, stage: str, points: Optional[Callable], func: Callable, args, kwargs):
+        if self._stack and self._stack[-1].stage == stage:
+            return func(*args, **kwargs)
+        record = StageRecord(stage, self._offset + time.perf_counter_ns(), depth=len(self._stack))
+        self._stack.append(record)
+        try:
+            ret = func(*args, **kwargs)
+        finally:
+            record.end = self._offset + time.perf_counter_ns()
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1].children += record.duration
+            self.records.append(record)
+        if points is not None:
+            record.points = points(ret, *args, **kwargs)
+        return ret
+
+    def _attribute_memory(self, events: Sequence[tuple[int, int]]):
+        # events: (time in ns since the epoch, signed number of bytes) of
+        # allocations and deallocations, in order
+        times = [t for t, _ in events]
+        level = list(accumulate(nbytes for _, nbytes in events))
+        for record in self.records:
+            i, j = bisect_left(times, record.start), bisect_right(times, record.end)
+            before = level[i-1] if i else 0
+            record.peak_bytes = max((level[k] - before for k in range(i, j)), default=0)
+
+    def summary(self) -> list[Mapping[str, Any]]:
+        """Per-stage aggregates: call counts, inclusive and self wall time (in
+        seconds), total evaluation points, and the maximum over calls of the
+        peak tensor bytes allocated within a call (if ``memory``)."""
+        stats = {}
+        for record in self.records:
+            s = stats.setdefault(record.stage, dict(
+                stage=record.stage, calls=0, time=0., self_time=0., points=None, peak_bytes=None))
+            s['calls'] += 1
+            s['time'] += record.duration / 1e9
+            s['self_time'] += (record.duration - record.children) / 1e9
+            if record.points is not None:
+                s['points'] = (s['points'] or 0) + record.points
+            if record.peak_bytes is not None:
+                s['peak_bytes'] = max(s['peak_bytes'] or 0, record.peak_bytes)
+        return sorted(stats.values(), key=lambda s: -s['time'])
+
+    def table(self) -> str:
+        lines = [f'{"stage":<20}{"calls":>8}{"time [ms]":>12}{"self [ms]":>12}{"points":>12}{"peak [MiB]":>12}']
+        for s in self.summary():
+            lines.append(
+                f'{s["stage"]:<20}{s["calls"]:>8}{1e3*s["time"]:>12.3f}{1e3*s["self_time"]:>12.3f}'
+                f'{"" if s["points"] is None else s["points"]:>12}'
+                f'{"" if s["peak_bytes"] is None else format(s["peak_bytes"] / 2**20, ".2f"):>12}'
+            )
+        return '\n'.join(lines)
+
+    def chrome_trace(self) -> Mapping[str, Any]:
+        """The records as complete events in the Chrome trace format."""
+        return {'traceEvents': [
+            dict(name=record.stage, cat='slicsim', ph='X', pid=0, tid=0,
+                 ts=record.start / 1e3, dur=record.duration / 1e3,
+                 args={key: val for key, val in (('points', record.points), ('peak_bytes', record.peak_bytes))
+                       if val is not None})
+            for record in self.records
+        ], 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path: Union[str, PathLike]):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+_active: Optional[Profile] = None
+
+
+def stage(name: str, points: Callable[..., int] = None) -> Callable[[_FuncT], _FuncT]:
+    """Record calls of the decorated function as the stage ``name``.
+
+    ``points``, if given, is called with the return value followed by the
+    arguments of the function to get the number of evaluation points.
+    """
+    def decorator(func: _FuncT) -> _FuncT:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            return _active._run(name, points, func, args, kwargs)
+        return wrapper
+    return decorator
+
+
+class profile:
+    """Context in which the evaluation stages are recorded into a `Profile`.
+
+    With ``memory=True``, tensor allocations are also recorded through
+    `torch.profiler`, which does add overhead.
+    """
+
+    def __init__(self, memory: bool = False):
+        self.profile = Profile(memory)
+        self._profiler = None
+
+    def __enter__(self) -> Profile:
+        global _active
+        if _active is not None:
+            raise RuntimeError('slicsim.profile contexts cannot be nested.')
+        if self.profile.memory:
+            from torch.profiler import profile as torch_profile, ProfilerActivity
+
+            self._profiler = torch_profile(
+                activities=[ProfilerActivity.CPU], profile_memory=True, record_shapes=True, with_stack=True)
+            self._profiler.__enter__()
+        _active = self.profile
+        return self.profile
+
+    def __exit__(self, *exc):
+        global _active
+        _active = None
+        if self._profiler is not None:
+            self._profiler.__exit__(*exc)
+            with TemporaryDirectory() as tmpdir:
+                fname = Path(tmpdir) / 'memory.raw.json.gz'
+                self._profiler.export_memory_timeline(str(fname), 'cpu')
+                events = json.loads(gzip.decompress(fname.read_bytes()))
+            # (time, action, signed bytes, category), where action 1 marks tensors that existed before
+            self.profile._attribute_memory(sorted(
+                (t, nbytes) for t, action, nbytes, _ in events if action != 1
+            ))
@@ -0,0 +1,226 @@
+"""Sharded on-disk storage of simulated light curves.
+
+A dataset is a directory with a ``manifest.json`` and a subdirectory per
+shard. Every shard holds (up to) ``shard_size`` samples as ``.npy`` files:
+
+- ``offsets.npy``: ``[N + 1]`` CSR offsets of each sample's observations;
+- ``times.npy``, ``bands.npy``, ``fluxcal.npy`` and, optionally,
+  ``fluxcalerr.npy``: the flat (ragged) observations of all samples, with
+  bands encoded as indices into the manifest's ``bands``;
+- ``param.<name>.npy``: ``[N, ...]`` per-sample parameters.
+
+Files are memory-mapped on reading, so that any sample is read in constant
+time without loading whole shards.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from os import PathLike
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from .model import Field, FieldBatch
+
+
+RAGGED = ('times', 'bands', 'fluxcal', 'fluxcalerr')
+MANIFEST = 'manifest.json'
+
+
+def _numpy(t) -> np.ndarray:
+    return t.detach().cpu().numpy() if torch.is_tensor(t) else np.asarray(t)
+
+
+@dataclass
+class _Chunk:
+    lengths: np.ndarray  # [N]
+    ragged: Mapping[str, np.ndarray]  # name -> [sum(lengths)]
+    params: Mapping[str, np.ndarray]  # name -> [N, ...]
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def split(self, n: int) -> tuple[_Chunk, _Chunk]:
+        cut = int(self.lengths[:n].sum())
+        return tuple(
+            _Chunk(self.lengths[sl], {key: val[rsl] for key, val in self.ragged.items()},
+                   {key: val[sl] for key, val in self.params.items()})
+            for sl, rsl in ((slice(None, n), slice(None, cut)), (slice(n, None), slice(cut, None)))
+        )
+
+    @classmethod
+    def cat(cls, chunks: Sequence[_Chunk]) -> _Chunk:
+        if len(chunks) == 1:
+            return chunks[0]
+        return cls(np.concatenate([c.lengths for c in chunks]), *(
+            {key: np.concatenate([getattr(c, attr)[key] for c in chunks]) for key in getattr(chunks[0], attr)}
+            for attr in ('ragged', 'params')
+        ))
+
+
+@dataclass
+class ShardWriter:
+    """Stream batches of simulated light curves into fixed-size shards.
+
+    Use as a context manager (or call `close`), so that the last, partially
+    filled shard is written::
+
+        with ShardWriter('sims', shard_size=100_000) as writer:
+            for _ in range(nbatches):
+                params = prior.sample()
+                writer.add(model.field, model.bandcountscal(**params), params)
+    """
+
+    path: Union[str, PathLike]
+    shard_size: int = 100_000
+
+    nsamples: int = field(default=0, init=False)
+    _shards: list[Mapping[str, Any]] = field(default_factory=list, init=False, repr=False)
+    _bands: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _params: dict[str, Mapping[str, Any]] = field(default=None, init=False, repr=False)
+    _pending: list[_Chunk] = field(default_factory=list, init=False, repr=False)
+    _npending: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+        if (self.path / MANIFEST).exists():
+            raise FileExistsError(f'{self.path} already contains a dataset.')
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _band_codes(self, f: Field) -> np.ndarray:
+        table = np.array([self._bands.setdefault(band.name, len(self._bands)) for band in f.band_table], dtype=np.int16)
+        return table[_numpy(f.band_codes)]
+
+    def add(self, f: Field, fluxcal: Tensor, params: Mapping[str, Any] = None, fluxcalerr: Tensor = None):
+        """Add a batch of samples.
+
+        Parameters
+        ----------
+        f
+            the field the light curves were simulated on. For a `FieldBatch`,
+            each object is a sample, and ``fluxcal`` is flat: ``[N_obs]``.
+            Otherwise, all samples share the field, and ``fluxcal`` is
+            ``[N, N_obs]`` (or ``[N_obs]`` for a single sample).
+        fluxcal
+            the (possibly noisy) calibrated fluxes
+        params
+            per-sample parameters with a leading dimension of ``N`` (or
+            scalars), e.g. the ones passed to the `LightcurveModel`
+        fluxcalerr
+            flux uncertainties broadcastable to ``fluxcal``, e.g.
+            `SurveyData.fluxcalerr`
+        """
+        fluxcal = _numpy(fluxcal)
+        times, bands = _numpy(torch.as_tensor(f.times)).astype(fluxcal.dtype, copy=False), self._band_codes(f)
+        if isinstance(f, FieldBatch):
+            if fluxcal.ndim != 1:
+                raise ValueError(f'Results on a FieldBatch should be flat, not of shape {fluxcal.shape}.')
+            lengths = np.asarray(f.nobs, dtype=np.int64)
+        else:
+            fluxcal = fluxcal.reshape(-1, len(bands))
+            lengths = np.full(len(fluxcal), len(bands), dtype=np.int64)
+            times, bands = np.tile(times, len(fluxcal)), np.tile(bands, len(fluxcal))
+        n = len(lengths)
+
+        ragged = dict(times=times, bands=bands, fluxcal=fluxcal.reshape(-1))
+        if fluxcalerr is not None:
+            ragged['fluxcalerr'] = np.broadcast_to(_numpy(fluxcalerr), fluxcal.shape).reshape(-1)
+
+        params = {key: _numpy(val) for key, val in (params or {}).items()}
+        params = {
+            key: np.broadcast_to(val, (n, *val.shape[1:]) if val.ndim else (n,))
+            for key, val in params.items()
+        }
+        spec = dict(
+            ragged=list(ragged),
+            params={key: dict(dtype=val.dtype.str, shape=val.shape[1:]) for key, val in params.items()})
+        if self._params is None:
+            self._params = spec
+        elif spec != self._params:
+            raise ValueError(f'All batches should have the same arrays and parameters, {self._params}, not {spec}.')
+
+        self._pending.append(_Chunk(lengths, ragged, params))
+        self._npending += n
+        while self._npending >= self.shard_size:
+            self._flush(self.shard_size)
+
+    def _flush(self, n: int):
+        chunk, rest = _Chunk.cat(self._pending).split(n)
+        self._pending, self._npending = [rest] if len(rest) else [], len(rest)
+
+        name = f'shard-{len(self._shards):05d}'
+        (path := self.path / name).mkdir()
+        np.save(path / 'offsets.npy', np.concatenate(([0], np.cumsum(chunk.lengths))))
+        for key, val in chunk.ragged.items():
+            np.save(path / f'{key}.npy', val)
+        for key, val in chunk.params.items():
+            np.save(path / f'param.{key}.npy', val)
+
+        self._shards.append(dict(name=name, nsamples=len(chunk), nobs=int(chunk.lengths.sum())))
+        self.nsamples += len(chunk)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        (self.path / MANIFEST).write_text(json.dumps(dict(
+            shard_size=self.shard_size, nsamples=self.nsamples, shards=self._shards,
+            bands=list(self._bands), **(self._params or dict(ragged=[], params={}))
+        ), indent=1))
+
+    def close(self):
+        if self._npending:
+            self._flush(self._npending)
+        self._write_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardReader(Sequence[Mapping[str, np.ndarray]]):
+    """Random access to the samples of a dataset written by `ShardWriter`.
+
+    Samples are dictionaries of (read-only, memory-mapped) arrays: the ragged
+    observations (with ``bands`` as indices into `bands`) and the parameters.
+    """
+
+    def __init__(self, path: Union[str, PathLike]):
+        self.path = Path(path)
+        self.manifest = json.loads((self.path / MANIFEST).read_text())
+        self.shard_size: int = self.manifest['shard_size']
+        self.bands: Sequence[str] = self.manifest['bands']
+        self._shards: list[Optional[Mapping[str, np.ndarray]]] = [None] * len(self.manifest['shards'])
+
+    def __len__(self):
+        return self.manifest['nsamples']
+
+    def shard(self, i: int) -> Mapping[str, np.ndarray]:
+        """The (memory-mapped) arrays of the ``i``-th shard."""
+        if self._shards[i] is None:
+            path = self.path / self.manifest['shards'][i]['name']
+            self._shards[i] = {
+                key: np.load(path / f'{fname}.npy', mmap_mode='r')
+                for key, fname in (
+                    ('offsets', 'offsets'),
+                    *((key, key) for key in self.manifest['ragged']),
+                    *((key, f'param.{key}') for key in self.manifest['params'])
+                )
+            }
+        return self._shards[i]
+
+    def __getitem__(self, i: int) -> Mapping[str, np.ndarray]:
+        if not -len(self) <= i < len(self):
+            raise IndexError(f'Sample {i} out of range for a dataset of {len(self)}.')
+        s, j = divmod(i % len(self), self.shard_size)
+        shard = self.shard(s)
+        start, stop = shard['offsets'][j:j+2]
+        return {
+            **{key: shard[key][start:stop] for key in self.manifest['ragged']},
+            **{key: shard[key][j] for key in self.manifest['params']}
+        }
@@ -1,14 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Callable, ClassVar, Tuple
+from typing import Callable, ClassVar, Tuple, TYPE_CHECKING
 
-from phytorch.interpolate import LinearNDGridInterpolator
 from phytorch.interpolate.abc import AbstractBatchedInterpolator
-from phytorch.units.cgs import erg
-from phytorch.units.si import angstrom, second
-from phytorch.units.unit import Unit
 from torch import Tensor
 
-from ..utils import _t, cached_property, Delayed
+from ..profiling import stage
+from ..utils import _t, cached_property, Delayed, is_tracing
+from ..utils.interpolated import InterpPlan, PlannedLinearNDGridInterpolator
 from ..utils.utility_base import UtilityBase
 
 
@@ -16,8 +14,21 @@ class Source(UtilityBase, ABC):
     @abstractmethod
     def flux(self, phase: _t, wave: _t, **kwargs) -> _t: ...
 
-    flux_unit: ClassVar[Unit] = erg / second / angstrom
+    if TYPE_CHECKING:
+        from phytorch.units.unit import Unit
 
+        flux_unit: ClassVar[Unit]
+    else:
+        # units are only imported on first use, since that is slow
+        @classmethod
+        @cached_property
+        def flux_unit(cls):
+            from phytorch.units.cgs import erg
+            from phytorch.units.si import angstrom, second
+
+            return erg / second / angstrom
+
+    @stage('base_source')
     def __call__(self, phase: _t, wave: _t, **kwargs):
         self.set_params(**kwargs)
         return self.flux(phase, wave, **kwargs)
@@ -44,12 +55,37 @@ class GridInterpSource(AbstractInterpSource, ABC):
     grid_wave:  Tensor  # [N_wave]
     grid_flux:  Tensor  # [..., N_phase, N_wave]
 
+    _grid_interpolator_class: ClassVar = PlannedLinearNDGridInterpolator
+
+    # (grid_phase, grid_wave, grid_flux), interpolator
+    _grid_interpolator: ClassVar[tuple[tuple[Tensor, Tensor, Tensor], PlannedLinearNDGridInterpolator]] = None
+
     @property
-    def grid_interpolator(self) -> LinearNDGridInterpolator:
-        return LinearNDGridInterpolator((self.grid_phase, self.grid_wave), self.grid_flux)
+    def grid_interpolator(self) -> PlannedLinearNDGridInterpolator:
+        grids = self.grid_phase, self.grid_wave, self.grid_flux
+        if self._grid_interpolator is None or not all(a is b for a, b in zip(self._grid_interpolator[0], grids)):
+            self._grid_interpolator = grids, self._grid_interpolator_class(grids[:2], grids[2])
+        return self._grid_interpolator[1]
+
+    # Cells and weights of the last evaluated (phase, wave), reused while these
+    # are the same tensors (see `InterpPlan`).
+    _interp_plan: ClassVar[tuple[PlannedLinearNDGridInterpolator, InterpPlan]] = None
+
+    # not copied when converting to another dtype or device (see `utils.migrate`)
+    _transient_attrs = ('_grid_interpolator', '_interp_plan')
 
+    @stage('interpolation')
     def interpolate_flux(self, phase: _t, wave: _t) -> Tensor:
-        return self._interpolate(self.grid_interpolator, phase, wave)
+        ipol = self.grid_interpolator
+        if is_tracing():
+            return ipol.evaluate(ipol.plan(phase, wave))
+        if self._interp_plan is not None and self._interp_plan[0] is ipol and self._interp_plan[1].matches(phase, wave):
+            plan = self._interp_plan[1]
+        else:
+            plan = ipol.plan(phase, wave)
+            if not any(getattr(_, 'requires_grad', False) for _ in (phase, wave)):
+                self._interp_plan = ipol, plan
+        return ipol.evaluate(plan)
 
 
 class TrainedGridInterpSource(GridInterpSource, ABC):
@@ -59,8 +95,8 @@ class TrainedGridInterpSource(GridInterpSource, ABC):
 
     @classmethod
     @cached_property
-    def grid_interpolator(cls) -> LinearNDGridInterpolator:
-        return classmethod(super().grid_interpolator.fget).__get__(cls, cls)()
+    def grid_interpolator(cls) -> PlannedLinearNDGridInterpolator:
+        return cls._grid_interpolator_class((cls.grid_phase, cls.grid_wave), cls.grid_flux)
 
 
 class DelayedGridInterpSource(TrainedGridInterpSource, Delayed, ABC):
@@ -5,13 +5,15 @@ from torch import Size, Tensor
 from typing_extensions import Self
 
 from phytorch.interpolate import interp2d
-from phytorch.interpolate.splines import SplineNd
 from phytorchx import broadcast_cat
 
 from .hsiao import HsiaoSource
-from ..utils import _t, cached_property, DataRegistry, Delayed
+from ..utils import _t, cached_property, DataRegistry, Delayed, in_functorch
 from ..utils.utility_base import UtilityBase
 
+if TYPE_CHECKING:
+    from phytorch.interpolate.splines import SplineNd
+
 
 class BayeSNSource(HsiaoSource):
     bayesn_phase: ClassVar[Tensor] = torch.tensor([-10, 0, 10, 20, 30, 40])  # days
@@ -20,13 +22,36 @@ class BayeSNSource(HsiaoSource):
     )
 
     def sed(self, phase, wave, **kwargs) -> Tensor:
+        if in_functorch():
+            return self._sed_gathered(phase, wave)
         return interp2d(phase, wave, self.grid_flux,
                         self.grid_phase[(0, -1),], self.grid_wave[(0, -1),],
                         mode='bilinear', align_corners=True)
 
+    def _sed_gathered(self, phase, wave) -> Tensor:
+        # The same bilinear interpolation (with zeros outside the grid) as
+        # `interp2d`, but through indexing, since ``grid_sample`` has neither
+        # a batching rule for its backward nor forward-mode derivatives.
+        n, m = self.grid_flux.shape[-2:]
+        (p0, p1), (w0, w1) = self.grid_phase[(0, -1),], self.grid_wave[(0, -1),]
+        x, y = torch.broadcast_tensors((phase - p0) / (p1 - p0) * (n-1), (wave - w0) / (w1 - w0) * (m-1))
+        x0, y0 = x.floor(), y.floor()
+
+        ret = 0
+        for i in (x0, x0+1):
+            for j in (y0, y0+1):
+                val = self.grid_flux[..., i.clamp(0, n-1).long(), j.clamp(0, m-1).long()]
+                ret = ret + torch.where(
+                    (i >= 0) & (i <= n-1) & (j >= 0) & (j <= m-1),
+                    (1 - (x - i).abs()) * (1 - (y - j).abs()) * val, 0)
+        return ret
+
     @classmethod
     @cached_property
-    def bayesn_spline(cls) -> SplineNd:
+    def bayesn_spline(cls) -> 'SplineNd':
+        # imported on first use, since it imports sympy
+        from phytorch.interpolate.splines import SplineNd
+
         return SplineNd(cls.bayesn_phase, cls.bayesn_wave)
 
 
@@ -71,7 +96,7 @@ class BayeSNSource(HsiaoSource):
     @property
     def e(self):
         if self._e is None:
-            self._e = torch.zeros(self._E_shape.numel())
+            self._e = self.L.new_zeros(self._E_shape.numel())
         return self._e
 
     @e.setter
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from .abc import DelayedGridInterpSEDSource
-from ..utils import _t, DataRegistry
+from ..utils import _t, cached_property, DataRegistry
 
 
 class HsiaoSource(DelayedGridInterpSEDSource):
-    # 1 / LightcurveModel(Distance(HsiaoSource()), Field([0.], [bessell_b], magsys=Vega)).bandcountscal()
-    flux_unit = 1.1949464989803864e+40 * DelayedGridInterpSEDSource.flux_unit
+    if not TYPE_CHECKING:
+        @classmethod
+        @cached_property
+        def flux_unit(cls):
+            # 1 / LightcurveModel(Distance(HsiaoSource()), Field([0.], [bessell_b], magsys=Vega)).bandcountscal()
+            return 1.1949464989803864e+40 * DelayedGridInterpSEDSource.flux_unit
 
     A: _t = 1.
     coeff_0 = property(lambda self: self.A)
@@ -1,4 +1,6 @@
-from ..extinction import FM07
+from typing import ClassVar, Type
+
+from ..extinction import Extinction, FM07
 
 from .abc import ColouredSource, DelayedGridInterpPCASource
 from ..utils import _t, DataRegistry
@@ -8,8 +10,10 @@ class SNEMOSource(ColouredSource, DelayedGridInterpPCASource):
     A_s: _t = 0.
     coeff_colour = property(lambda self: self.A_s)
 
+    _Extinction: ClassVar[Type[Extinction]] = FM07
+
     def colourlaw(self, phase: _t, wave: _t) -> _t:
-        return FM07.linear(wave)
+        return self._Extinction.linear(wave)
 
 
 class SNEMO2Source(SNEMOSource):
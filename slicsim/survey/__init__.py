@@ -3,6 +3,7 @@ from functools import reduce
 from operator import add
 from typing import Mapping, Any, TypedDict, Type
 
+import numpy as np
 import pandas as pd
 import torch
 from torch import Tensor
@@ -63,8 +64,9 @@ class SurveyData:
     #     # SNANA manual, 4.14, (10)
     #     return ((self.background / self.gain)**0.5).to(ADU).value  # * 10**(0.4*(zp-self.zp_mag_mean))
 
-    @classmethod
-    def from_phot(cls, phot: pd.DataFrame, meta: Mapping[str, Any], bandmap: Mapping[str, Bandpass], magsys: MagSys):
+    @staticmethod
+    def _columns_data(columns: Mapping[str, Any]) -> dict[str, Any]:
+        # columns are named as in SNANA text photometry files
         extra_data = dict(
             (name_out, val * unit if unit is not False else val)
             for name_in, name_out, unit in (
@@ -80,8 +82,8 @@ class SurveyData:
                 ('PSF2', 'psf2', linpx),
                 ('PSFRATIO', 'ratio', False)
             )
-            if name_in in phot
-            for val in [torch.tensor(phot[name_in].to_numpy().astype(float), dtype=torch.get_default_dtype())]
+            if name_in in columns
+            for val in [torch.tensor(np.asarray(columns[name_in]).astype(float), dtype=torch.get_default_dtype())]
         )
 
         if 'psf' in extra_data:
@@ -92,10 +94,18 @@ class SurveyData:
         if 'sky_sig' in extra_data:
             extra_data['sky_noise'] = extra_data.pop('sky_sig')**2
 
+        return extra_data
+
+    @classmethod
+    def from_phot(cls, phot: pd.DataFrame, meta: Mapping[str, Any], bandmap: Mapping[str, Bandpass], magsys: MagSys):
+        extra_data = cls._columns_data(phot)
+
+        codes, bands = pd.factorize(phot['FLT'])
         return cls(
-            field=Field(
+            field=Field.from_codes(
                 times=extra_data.pop('mjd') - meta.get('PEAKMJD', 0),
-                bands=[bandmap[band] for band in phot['FLT']],
+                band_table=[bandmap[band] for band in bands],
+                codes=torch.from_numpy(codes),
                 magsys=magsys
             ), **extra_data
         )
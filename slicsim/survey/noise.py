@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence, Union
+
+import torch
+from torch import Size, Tensor
+
+from . import SurveyData
+from .units import ADU, electrons
+from ..utils import _t
+
+
+@dataclass
+class NoiseModel:
+    """Vectorised noise realisations of calibrated fluxes.
+
+    All attributes are bare tensors (broadcastable to the shape of the fluxes,
+    usually ``[N_obs]`` or ``[N_objects, N_obs]``), so that no unit
+    conversions are made when drawing noise. Use `from_survey` to convert the
+    `Quantity`'s of a `SurveyData` once.
+    """
+
+    zp_mag: _t  # [mag], zero point of the counts in ADU
+    background: _t  # [ADU], sky and CCD signal within the PSF area
+    gain: _t  # [e- / ADU]
+
+    ZPCAL = SurveyData.ZPCAL
+
+    @classmethod
+    def from_survey(cls, data: SurveyData) -> NoiseModel:
+        return cls(
+            zp_mag=data.zp_mag_mean,
+            background=data.bgflux.to(ADU).value,
+            gain=data.gain.to(electrons / ADU).value
+        )
+
+    @property
+    def adu_per_fluxcal(self) -> _t:
+        return 10**(0.4*(self.zp_mag - self.ZPCAL))
+
+    def fluxcalerr(self, fluxcal: Tensor) -> Tensor:
+        """The Poisson uncertainty of ``fluxcal`` (see `SurveyData.calc_fluxcalerr`)."""
+        scale = self.adu_per_fluxcal
+        return ((fluxcal * scale + self.background) / self.gain).clamp(min=0)**0.5 / scale
+
+    def sample(self, fluxcal: Tensor, sample_shape: Union[int, Sequence[int]] = (),
+               poisson: bool = False, generator: torch.Generator = None) -> tuple[Tensor, Tensor]:
+        """Draw noisy realisations of ``fluxcal``.
+
+        Parameters
+        ----------
+        fluxcal
+            true calibrated fluxes, e.g. the result of
+            `LightcurveModel.bandcountscal`
+        sample_shape
+            the number (or shape) of independent realisations, prepended to
+            the shape of the result
+        poisson
+            whether to draw the number of electrons from the source and
+            background from a Poisson distribution (valid for low counts)
+            rather than from its Gaussian approximation
+        generator
+            passed on to the `torch` sampling functions
+
+        Returns
+        -------
+        The noisy FLUXCAL and the FLUXCALERR (computed from the true flux),
+        both of shape ``sample_shape + broadcast_shape(fluxcal, ...)``.
+        """
+        sample_shape = Size((sample_shape,) if isinstance(sample_shape, int) else sample_shape)
+        scale = self.adu_per_fluxcal
+        signal = fluxcal * scale + self.background  # [ADU]
+        shape = sample_shape + signal.shape
+
+        if poisson:
+            noisy = torch.poisson((signal * self.gain).clamp(min=0).expand(shape), generator=generator) / self.gain
+        else:
+            noisy = signal + (signal / self.gain).clamp(min=0)**0.5 * torch.randn(
+                shape, generator=generator, dtype=signal.dtype, device=signal.device)
+
+        return (noisy - self.background) / scale, self.fluxcalerr(fluxcal).expand(shape)
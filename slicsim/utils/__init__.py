@@ -20,7 +20,17 @@ _T = TypeVar('_T')
 # TODO: CHECK THIS!!!!
 class cached_property(property):
     def __get__(self, instance=None, typ=None):
-        res = super().__get__(instance, typ)
+        if instance is None or isinstance(instance, type):
+            # Class-level data does not depend on parameters, so it is
+            # computed outside of any active `torch.func` transform.
+            with torch._C._DisableFuncTorch():
+                res = super().__get__(instance, typ)
+            if instance is not None:
+                # Remember the (class)property that is replaced by its value
+                # below, so that `migrate` can compute it anew.
+                instance.__class_cached__ = {**vars(instance).get('__class_cached__', {}), self.fget.__name__: classmethod(self)}
+        else:
+            res = super().__get__(instance, typ)
         setattr(instance or typ, self.fget.__name__, res)
         return res
 
@@ -36,8 +46,25 @@ def _regitem(func, *args, _propertizer=property, **kwargs):
     return staticmethod(partial(func, *args, **kwargs))
 
 
+def load_data(fname, mmap=True, **kwargs):
+    """Load a ``.pt`` data file, by default memory-mapping its tensors.
+
+    Memory-mapped tensors are read from disk on first access, and their pages
+    are shared by all processes on the node that load the same file (until
+    written to). Files in the legacy (non-zip) serialisation format, which
+    cannot be memory-mapped, are loaded fully; convert them with
+    ``scripts/convert_data_mmap.py``.
+    """
+    if mmap:
+        try:
+            return phytorchx.load(fname, mmap=True, **kwargs)
+        except RuntimeError:
+            pass
+    return phytorchx.load(fname, **kwargs)
+
+
 def _regtorch(path, **kwargs):
-    return _regitem(phytorchx.load, _fullpath(path), **kwargs)
+    return _regitem(load_data, _fullpath(path), **kwargs)
 
 
 class DataRegistry:
@@ -88,4 +115,43 @@ class Delayed:
         return classmethod(cls.DelayedAnnotated(key=key))
 
 
+def in_functorch() -> bool:
+    """Whether a `torch.func` transform (e.g. ``vmap`` or ``grad``) is active."""
+    return torch._C._functorch.maybe_current_level() is not None
+
+
+def is_tracing() -> bool:
+    """Whether a graph is being traced or compiled, or a `torch.func` transform
+    is active (see `in_functorch`), so nothing should be cached."""
+    from torch.fx.experimental.proxy_tensor import get_innermost_proxy_mode
+
+    return torch.compiler.is_compiling() or get_innermost_proxy_mode() is not None or in_functorch()
+
+
+class ArgsMemo:
+    """Remember the result of a function until its arguments change.
+
+    Tensor arguments are compared by identity and in-place version, and others
+    by equality. Nothing is remembered if any argument requires grad, or while
+    tracing (see `is_tracing`).
+    """
+
+    def __init__(self):
+        self.args = self.versions = self.value = None
+
+    def _matches(self, args) -> bool:
+        return self.args is not None and len(args) == len(self.args) and all(
+            (a is b and a._version == v) if torch.is_tensor(a) else (not torch.is_tensor(b) and a == b)
+            for a, b, v in zip(args, self.args, self.versions)
+        )
+
+    def __call__(self, func: Callable, *args):
+        if is_tracing() or any(torch.is_tensor(arg) and arg.requires_grad for arg in args):
+            return func(*args)
+        if not self._matches(args):
+            self.value = func(*args)
+            self.args, self.versions = args, tuple(getattr(arg, '_version', None) for arg in args)
+        return self.value
+
+
 _t = Union[float, Tensor]
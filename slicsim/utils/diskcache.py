@@ -0,0 +1,196 @@
+"""A persistent, content-addressed cache of derived tensors.
+
+Entries are keyed by a `fingerprint` of the data they are derived from (e.g.
+the wavelengths and transmissions of a bandpass, see
+`Bandpass._cache_key`), so modified data is never served stale, and by the
+version of `slicsim`, so a new release recomputes everything. Entries are
+written to a temporary file and atomically renamed into place, so concurrent
+writers (e.g. the workers of a `SimulationPool`) are safe: they all store
+the same value, and readers only ever see complete files. The least
+recently used entries are evicted when the cache grows above its size
+limit.
+
+The cache is off unless enabled with `set_cache` (or through the
+``SLICSIM_CACHE_DIR`` environment variable, which is inherited by worker
+processes). It is used for magnitude system zero points, reduced band
+quadratures and the evaluation points of fields.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, TypeVar, Union
+
+import numpy as np
+import torch
+
+from . import is_tracing, load_data
+from .. import __version__
+
+
+_T = TypeVar('_T')
+
+# bump when the layout of cached values changes
+FORMAT = 1
+
+
+class _RequiresGrad(ValueError):
+    pass
+
+
+def _update(h, obj):
+    if torch.is_tensor(obj) and obj.requires_grad:
+        # the cached value would be detached from the graph
+        raise _RequiresGrad('cannot fingerprint tensors that require grad')
+    if hasattr(obj, 'unit') and torch.is_tensor(obj):
+        h.update(f'Q{obj.unit}'.encode())
+        obj = obj.value
+    if torch.is_tensor(obj):
+        # values derived on different devices are cached separately, since
+        # they are stored (and loaded) on the device they were computed on
+        h.update(f'T{obj.dtype}{tuple(obj.shape)}{obj.device}'.encode())
+        obj = obj.detach().cpu().contiguous()
+        h.update(obj.view(-1).view(torch.uint8).numpy().data if obj.numel() else b'')
+    elif isinstance(obj, np.ndarray):
+        h.update(f'A{obj.dtype.str}{obj.shape}'.encode())
+        h.update(np.ascontiguousarray(obj).data)
+    elif isinstance(obj, bytes):
+        h.update(f'B{len(obj)}'.encode())
+        h.update(obj)
+    elif isinstance(obj, (tuple, list)):
+        h.update(f'({len(obj)}'.encode())
+        for o in obj:
+            _update(h, o)
+    elif obj is None or isinstance(obj, (str, int, float, bool)):
+        h.update(f'{type(obj).__name__}:{obj!r}'.encode())
+    else:
+        raise TypeError(f'cannot fingerprint {type(obj).__name__}')
+
+
+def fingerprint(*parts) -> str:
+    """A hash of (nested sequences of) tensors, arrays, bytes and builtin scalars."""
+    h = hashlib.sha256()
+    _update(h, parts)
+    return h.hexdigest()
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get('XDG_CACHE_HOME', '~/.cache')).expanduser() / 'slicsim'
+
+
+@dataclass
+class DiskCache:
+    path: Path
+    max_bytes: int = 2**30
+
+    # leftovers of interrupted writes older than this (in seconds) are removed
+    stale_tmp: float = 3600.
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+
+    def _file(self, key: str) -> Path:
+        return self.path / f'{fingerprint(FORMAT, __version__, key)}.pt'
+
+    def get(self, key: str, default=None, mmap=True):
+        """The value stored under ``key`` (memory-mapped if possible), or
+        ``default``."""
+        fname = self._file(key)
+        try:
+            value = load_data(fname, mmap=mmap)
+            os.utime(fname)
+        except (FileNotFoundError, EOFError, RuntimeError, pickle.UnpicklingError, zipfile.BadZipFile):
+            # missing, concurrently evicted, or (somehow) corrupt
+            return default
+        return value
+
+    def put(self, key: str, value):
+        """Store ``value`` under ``key``, unless it alone exceeds `max_bytes`."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                torch.save(value, f)
+            if os.path.getsize(tmp) <= self.max_bytes:
+                os.replace(tmp, self._file(key))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+
+    def __call__(self, key: str, func: Callable[[], _T]) -> _T:
+        """The value stored under ``key``, or the result of ``func()``,
+        which is then stored."""
+        value = self.get(key, default=self)
+        if value is self:
+            value = func()
+            self.put(key, value)
+        return value
+
+    def evict(self):
+        """Remove the least recently used entries until the total size is
+        within `max_bytes`."""
+        entries, now = [], time.time()
+        for fname in self.path.iterdir():
+            try:
+                stat = fname.stat()
+                if fname.suffix == '.pt':
+                    entries.append((stat.st_mtime, stat.st_size, fname))
+                elif fname.suffix == '.tmp' and now - stat.st_mtime > self.stale_tmp:
+                    fname.unlink()
+            except FileNotFoundError:
+                pass
+
+        size = sum(s for _, s, _ in entries)
+        for _, s, fname in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            fname.unlink(missing_ok=True)
+            size -= s
+
+    def clear(self):
+        for fname in self.path.glob('*.pt'):
+            fname.unlink(missing_ok=True)
+
+
+_cache: Union[DiskCache, None, bool] = False
+
+
+def set_cache(cache: Union[DiskCache, str, os.PathLike, bool, None] = True, **kwargs):
+    """Enable (in `default_cache_dir`, if ``True``, or at the given path) or
+    disable (with ``None``) the cache, or (with ``False``) defer to the
+    environment again. ``kwargs`` are passed to `DiskCache`."""
+    global _cache
+    if cache is True:
+        cache = default_cache_dir() / 'derived'
+    _cache = cache if cache in (None, False) or isinstance(cache, DiskCache) else DiskCache(cache, **kwargs)
+
+
+def get_cache() -> Optional[DiskCache]:
+    if _cache is False:
+        path = os.environ.get('SLICSIM_CACHE_DIR')
+        set_cache(DiskCache(path, **(
+            dict(max_bytes=int(os.environ['SLICSIM_CACHE_MAX_BYTES']))
+            if 'SLICSIM_CACHE_MAX_BYTES' in os.environ else {})
+        ) if path else None)
+    return _cache
+
+
+def cached(func: Callable[[], _T], *key) -> _T:
+    """``func()``, through the cache (if enabled) under the `fingerprint` of
+    ``key``, unless tracing or ``key`` contains tensors that require grad."""
+    cache = get_cache()
+    if cache is None or is_tracing():
+        return func()
+    try:
+        key = fingerprint(*key)
+    except _RequiresGrad:
+        return func()
+    return cache(key, func)
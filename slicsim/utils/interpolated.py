@@ -1,9 +1,10 @@
 from abc import abstractmethod, ABC
-from typing import ClassVar, Callable, Union, Sequence, Type
+from typing import ClassVar, Callable, NamedTuple, Union, Sequence, Type
 
+import torch
 from torch import Tensor
 
-from phytorch.interpolate import Linear1dInterpolator
+from phytorch.interpolate import Linear1dInterpolator, LinearNDGridInterpolator
 from phytorch.interpolate.abc import AbstractBatchedInterpolator
 
 from . import _t, cached_property, Delayed
@@ -39,3 +40,73 @@ class Linear1dInterpolated(Interpolated):
 
 class DelayedLinear1dInterpolated(DelayedInterpolated, Linear1dInterpolated):
     pass
+
+
+class InterpPlan(NamedTuple):
+    """Grid cells and weights of a fixed set of points."""
+
+    inputs: tuple[Tensor, ...]
+    versions: tuple[int, ...]
+    idxs: Tensor  # [..., 2**ndim]
+    ws: Tensor  # [..., 2**ndim]
+
+    def matches(self, *inputs: Tensor) -> bool:
+        return len(inputs) == len(self.inputs) and all(
+            a is b and a._version == v
+            for a, b, v in zip(inputs, self.inputs, self.versions)
+        )
+
+
+class PlannedLinearNDGridInterpolator(LinearNDGridInterpolator):
+    """A `LinearNDGridInterpolator` (on 1-dimensional grids) that separates
+    locating the points on the grid (`plan`) from interpolating (`evaluate`),
+    so that plans can be reused for fixed points.
+
+    The result has the channel dimensions right before the last batch
+    dimension.
+
+    Cells along uniformly spaced axes are located arithmetically, and along
+    the rest by binary search.
+    """
+
+    def __init__(self, grids: Sequence[Tensor], values: Tensor, channel_ndim=-1, uniform: Sequence[bool] = None, **kwargs):
+        super().__init__(grids, values, channel_ndim, **kwargs)
+        self.uniform = tuple(map(self.is_uniform, self.grids)) if uniform is None else tuple(uniform)
+
+    @staticmethod
+    def is_uniform(grid: Tensor, rtol=1e-6) -> bool:
+        if grid.ndim != 1 or len(grid) < 2:
+            return False
+        dgrid = torch.diff(grid)
+        return bool(((dgrid - dgrid[0]).abs() <= rtol * dgrid[0].abs()).all())
+
+    def project(self, x: Tensor, axis: int) -> tuple[Tensor, Tensor]:
+        grid = self.grids[axis]
+        idx = (
+            torch.floor_divide(x - grid[0], grid[1] - grid[0]).long()
+            if self.uniform[axis] else
+            torch.searchsorted(grid, x.contiguous(), right=True).sub_(1)
+        ).clamp(0, grid.shape[-1]-2)  # not in-place, which has no batching rule (for `torch.func.vmap`)
+        return idx, 1 - (x - grid[idx]) / self.dgrids[axis][idx]
+
+    def plan(self, *args: Tensor) -> InterpPlan:
+        idxs, ws = (
+            torch.stack(_, -1).unsqueeze(-2) for _ in zip(*(
+                self.project(x, axis)
+                for axis, x in enumerate(torch.broadcast_tensors(*map(torch.as_tensor, args)))
+            )))
+
+        ws = (self.di - ws).prod(-1).abs()
+        return InterpPlan(
+            args, tuple(getattr(arg, '_version', None) for arg in args),
+            ((idxs + self.di) * self.strides).sum(-1), ws / ws.sum(-1, keepdim=True)
+        )
+
+    def evaluate(self, plan: InterpPlan) -> Tensor:
+        res = (self.values.flatten(-self.ndim)[..., plan.idxs] * plan.ws).sum(-1)
+        return res.movedim(
+            tuple(range(self.channel_ndim)), tuple(range(-self.channel_ndim-1, -1))
+        ) if self.channel_ndim and plan.idxs.ndim > 1 else res
+
+    def __call__(self, x: Tensor) -> Tensor:
+        return self.evaluate(self.plan(*x.unbind(-1)))
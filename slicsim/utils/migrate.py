@@ -0,0 +1,164 @@
+"""Conversion of models, including their class-level data, to a dtype and device.
+
+Tensors are converted by `migrate`: floating-point ones to the given dtype,
+and all to the given device. Objects are copied with their attributes
+migrated; instances of `slicsim` classes additionally become instances of
+the class's `migrated_class`, so that they do not compare equal to (and
+share ``functools.cache`` entries with) the originals.
+
+`migrated_class` is a subclass (created once per original class, dtype and
+device) in which class-level tensors are converted and class-level cached
+properties (e.g. the template grids of `Delayed` sources and their
+interpolators) are computed anew from the converted data of the original.
+"""
+
+from __future__ import annotations
+
+import copyreg
+import functools
+from enum import Enum
+from inspect import getattr_static
+from typing import Mapping, Optional, TypeVar, Union
+
+import numpy as np
+import torch
+
+from . import cached_property, Delayed
+
+
+_T = TypeVar('_T')
+_deviceT = Optional[Union[str, torch.device]]
+
+# migrations of instances of classes with ``_migrate_once`` (the module-level
+# bandpasses and magnitude systems), which are reused by all models
+_migrated_once: dict[tuple[int, Optional[torch.dtype], _deviceT], tuple[object, object]] = {}
+
+
+def _is_class_cached(attr) -> bool:
+    return isinstance(attr, classmethod) and isinstance(attr.__func__, cached_property)
+
+
+def _class_cached(klass: type, name: str):
+    """The class-level cached property ``name`` defined on ``klass``, even if
+    it has already been replaced by its value, or ``None``."""
+    attr = vars(klass).get('__class_cached__', {}).get(name, vars(klass).get(name))
+    return attr if _is_class_cached(attr) else None
+
+
+def _has_tensors(obj) -> bool:
+    if torch.is_tensor(obj):
+        return True
+    if isinstance(obj, Mapping):
+        return any(map(_has_tensors, obj.values()))
+    if isinstance(obj, (tuple, list)):
+        return any(map(_has_tensors, obj))
+    return False
+
+
+def _is_slicsim(cls: type) -> bool:
+    return cls.__module__.split('.', 1)[0] == __name__.split('.', 1)[0] and not issubclass(cls, Enum)
+
+
+@functools.cache
+def _class_data(cls: type, dtype: Optional[torch.dtype], device: _deviceT) -> Mapping[str, object]:
+    """The class-level attributes of ``cls`` that differ in its migrated class."""
+    ns = {}
+    for name in {name for klass in cls.__mro__ for name in vars(klass) if not name.startswith('__')}:
+        attr = getattr_static(cls, name)
+        if not hasattr(attr, '__get__') and any(_class_cached(klass, name) for klass in cls.__mro__):
+            # the cached value of a class-level property: compute it anew
+            ns[name] = next(filter(None, (_class_cached(klass, name) for klass in cls.__mro__)))
+        elif _is_class_cached(attr):
+            ns[name] = attr
+        elif _has_tensors(attr):
+            ns[name] = migrate(attr, dtype, device)
+        elif isinstance(attr, type) and attr is not cls and _is_slicsim(attr) and _class_data(attr, dtype, device):
+            ns[name] = migrated_class(attr, dtype, device)
+
+    if issubclass(cls, Delayed):
+        def _delayed_data(_):
+            return migrate(cls._delayed_data, dtype, device)
+        ns['_delayed_data'] = classmethod(cached_property(_delayed_data))
+
+    return ns
+
+
+@functools.cache
+def _migrated_meta(meta: type) -> type:
+    ret = type(f'Migrated{meta.__name__}', (meta,), {})
+    # pickled by reference to the original class (cf. `PicklableMagSysMeta`)
+    copyreg.pickle(ret, lambda cls: (migrated_class, cls.__dict__['_migrated_args']))
+    return ret
+
+
+@functools.cache
+def migrated_class(cls: type, dtype: Optional[torch.dtype] = None, device: _deviceT = None) -> type:
+    """A subclass of ``cls`` that holds its class-level data in ``dtype``
+    and on ``device``, or ``cls`` itself if it is not a `slicsim` class."""
+    if not _is_slicsim(cls):
+        return cls
+    return _migrated_meta(type(cls))(cls.__name__, (cls,), dict(
+        _class_data(cls, dtype, device),
+        __module__=cls.__module__, __qualname__=cls.__qualname__, __doc__=cls.__doc__,
+        _migrated_args=(cls, dtype, device)
+    ))
+
+
+def _migrated_class(cls: type, dtype: Optional[torch.dtype], device: _deviceT) -> type:
+    # a migrated class is migrated again from its original
+    if '_migrated_args' in cls.__dict__:
+        cls, _dtype, _device = cls.__dict__['_migrated_args']
+        dtype, device = _dtype if dtype is None else dtype, _device if device is None else device
+    return migrated_class(cls, dtype, device)
+
+
+def migrate(obj: _T, dtype: Optional[torch.dtype] = None, device: _deviceT = None, memo: dict = None) -> _T:
+    """A copy of ``obj`` with all reachable tensors (and class-level data)
+    converted to ``dtype`` (if floating point) and moved to ``device``.
+
+    Cached properties of instances are not copied but computed anew, as are
+    the attributes that classes list in ``_transient_attrs``. Objects that
+    are reachable more than once are converted once (through ``memo``), and
+    instances of classes with ``_migrate_once`` once per dtype and device.
+    """
+    memo = {} if memo is None else memo
+    if id(obj) not in memo:
+        if getattr(type(obj), '_migrate_once', False):
+            key = id(obj), dtype, device
+            if key not in _migrated_once:
+                _migrated_once[key] = obj, _migrate(obj, dtype, device, memo)
+            memo[id(obj)] = _migrated_once[key][1]
+        else:
+            memo[id(obj)] = _migrate(obj, dtype, device, memo)
+    return memo[id(obj)]
+
+
+def _migrate(obj, dtype: Optional[torch.dtype], device: _deviceT, memo: dict):
+    cls = type(obj)
+    if torch.is_tensor(obj):
+        return obj.to(device=device, dtype=dtype if dtype is not None and obj.is_floating_point() else None)
+    if isinstance(obj, type):
+        return _migrated_class(obj, dtype, device)
+    if cls is dict:
+        ret = memo[id(obj)] = {}
+        for key, val in obj.items():
+            ret[migrate(key, dtype, device, memo)] = migrate(val, dtype, device, memo)
+        return ret
+    if cls in (tuple, list):
+        return cls(migrate(val, dtype, device, memo) for val in obj)
+    if isinstance(obj, tuple) and hasattr(obj, '_fields'):
+        return cls(*(migrate(val, dtype, device, memo) for val in obj))
+    if isinstance(obj, np.ndarray) and obj.dtype == object:
+        ret = memo[id(obj)] = np.empty_like(obj)
+        for idx, val in np.ndenumerate(obj):
+            ret[idx] = migrate(val, dtype, device, memo)
+        return ret
+    if _is_slicsim(cls) or (not callable(obj) and _has_tensors(getattr(obj, '__dict__', None))):
+        ret = memo[id(obj)] = object.__new__(_migrated_class(cls, dtype, device))
+        transient = {name for klass in cls.__mro__ for name in vars(klass).get('_transient_attrs', ())}
+        for key, val in vars(obj).items():
+            # cached (derived) values are computed anew
+            if key not in transient and not isinstance(getattr_static(cls, key, None), (property, functools.cached_property)):
+                ret.__dict__[key] = migrate(val, dtype, device, memo)
+        return ret
+    return obj
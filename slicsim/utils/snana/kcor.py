@@ -1,63 +1,135 @@
+import os
 from collections import defaultdict
+from io import BytesIO
 from pathlib import Path
-from typing import NamedTuple, Mapping, Iterable, TypeVar
+from typing import Any, NamedTuple, Mapping, Iterable, Optional, TypeVar, Union
 
+import numpy as np
+import torch
 from astropy.io import fits
 from astropy.io.fits import BinTableHDU, HDUList
-from astropy.table import Table
+from torch import Tensor
 
-from clipppy.utils import to_tensor
 from ...bandpasses.bandpass import Bandpass, LinearInterpolatedBandpass
 from ...bandpasses.magsys import MagSys, CompositeMagSys, InterpolatedSpectralMagSys, PicklableMagSysMeta
+from .. import diskcache
+
+
+def to_tensor(col) -> Tensor:
+    col = np.asarray(col)
+    # FITS data is big-endian, and torch only shares memory with native arrays.
+    # The stored dtype is kept, so that cached data does not depend on the
+    # default dtype: see `_float`.
+    return torch.from_numpy(col.astype(col.dtype.newbyteorder('='), copy=False))
+
+
+def _float(t: Tensor) -> Tensor:
+    # a copy only if the stored dtype is not the default
+    return t.to(torch.get_default_dtype())
+
+
+def _strip(col) -> list[str]:
+    return np.char.strip(np.asarray(col).astype(str)).tolist()
 
 
 class KCor(NamedTuple):
     magsys: Mapping[str, MagSys]
     zpoffs: Mapping[str, CompositeMagSys.BandZP]
     bands:  Mapping[str, Bandpass]
+    surveys: Mapping[str, str] = {}  # band name -> survey
+
+    # The parsed contents of a kcor file, as a mapping of tensors and lists
+    # (see `parse`), from which a `KCor` is built with `from_data`.
+    _dataT = Mapping[str, Any]
 
     @staticmethod
-    def get_magsys(magsys_hdu: BinTableHDU):
+    def get_magsys(magsys_hdu: BinTableHDU) -> _dataT:
         assert magsys_hdu.name == 'PrimarySED'
 
-        t = Table(magsys_hdu.data)
-        wave = to_tensor(t.columns[0].tolist())
-        return {name: InterpolatedSpectralMagSys(
-            name, wave,
-            to_tensor(t[name].tolist()) / 10  # per 10 angstrom...
-        ) for name in t.columns[1:]}
+        names = magsys_hdu.data.names
+        return dict(wave=to_tensor(magsys_hdu.data[names[0]]), seds={
+            name: to_tensor(magsys_hdu.data[name]) / 10  # per 10 angstrom...
+            for name in names[1:]
+        })
 
     @staticmethod
-    def get_zpoffs(zpoff_hdu: BinTableHDU, magsys: Mapping[str, MagSys]):
+    def get_zpoffs(zpoff_hdu: BinTableHDU) -> _dataT:
         assert zpoff_hdu.name == 'ZPoff'
 
-        return {
-            row[0].strip(): CompositeMagSys.BandZP(magsys[row[1].strip()], row[2])
-            for row in Table(zpoff_hdu.data).iterrows()
-        }
+        names = zpoff_hdu.data.names
+        return dict(
+            bands=_strip(zpoff_hdu.data[names[0]]), magsys=_strip(zpoff_hdu.data[names[1]]),
+            zps=np.asarray(zpoff_hdu.data[names[2]], dtype=float).tolist())
 
     @staticmethod
-    def get_bands(filter_hdu: BinTableHDU, thresh=1e-6):
+    def get_bands(filter_hdu: BinTableHDU) -> _dataT:
         assert filter_hdu.name == 'FilterTrans'
 
-        t = Table(filter_hdu.data)
-        wave = to_tensor(t.columns[0].tolist())
+        names = filter_hdu.data.names
+        return dict(wave=to_tensor(filter_hdu.data[names[0]]), trans={
+            name: to_tensor(filter_hdu.data[name]) for name in names[1:]
+        })
+
+    @staticmethod
+    def get_surveys(header: fits.Header) -> Mapping[str, str]:
         return {
-            name: LinearInterpolatedBandpass(name, (
-                wave[mask], trans[mask]
-            )) for name in t.columns[1:]
-            for trans in [to_tensor(t[name].tolist())]
-            for mask in [trans >= thresh]
+            bandname: survey
+            for i in range(header['NFILTERS']) for hkey in [f'FILT{i+1:0>3}'] for bandname in [header[hkey]]
+            for survey in [header.comments[hkey].rsplit('SURVEY=', 1)[1]] if survey
         }
 
     @classmethod
-    def from_fits(cls, file: HDUList, trans_thresh=1e-6):
+    def parse(cls, file: HDUList) -> _dataT:
+        return dict(
+            magsys=cls.get_magsys(file[6]), zpoffs=cls.get_zpoffs(file[1]),
+            bands=cls.get_bands(file[5]), surveys=cls.get_surveys(file[0].header)
+        )
+
+    @classmethod
+    def from_data(cls, data: _dataT, trans_thresh=1e-6):
+        magsys = {
+            name: InterpolatedSpectralMagSys(name, _float(data['magsys']['wave']), _float(flux))
+            for name, flux in data['magsys']['seds'].items()
+        }
+        wave = _float(data['bands']['wave'])
         return cls(
-            magsys=(magsys := cls.get_magsys(file[6])),
-            zpoffs=cls.get_zpoffs(file[1], magsys),
-            bands=cls.get_bands(file[5], trans_thresh)
+            magsys=magsys,
+            zpoffs={
+                band: CompositeMagSys.BandZP(magsys[ms], zp)
+                for band, ms, zp in zip(*(data['zpoffs'][key] for key in ('bands', 'magsys', 'zps')))
+            },
+            bands={
+                name: LinearInterpolatedBandpass(name, (wave[mask], trans[mask]))
+                for name, trans in data['bands']['trans'].items()
+                for trans in [_float(trans)] for mask in [trans >= trans_thresh]
+            },
+            surveys=data['surveys']
         )
 
+    @classmethod
+    def from_fits(cls, file: HDUList, trans_thresh=1e-6):
+        return cls.from_data(cls.parse(file), trans_thresh)
+
+    @classmethod
+    def load(cls, fname: Union[str, os.PathLike], trans_thresh=1e-6, cache_dir: Optional[Path] = None):
+        """Read a kcor file, or the cache of its parsed contents.
+
+        The cache (if ``cache_dir`` is given) is keyed by the hash of the
+        file's contents, so that modified files are parsed anew.
+        """
+        content = Path(fname).read_bytes()
+
+        def parse():
+            with fits.open(BytesIO(content)) as file:
+                return cls.parse(file)
+
+        data = diskcache.DiskCache(cache_dir)(diskcache.fingerprint(content), parse) if cache_dir else parse()
+        return cls.from_data(data, trans_thresh)
+
+
+def default_cache_dir() -> Path:
+    return diskcache.default_cache_dir() / 'kcor'
+
 
 _KT = TypeVar('_KT')
 _VT = TypeVar('_VT')
@@ -70,22 +142,26 @@ def multivaluedict(items: Iterable[tuple[_KT, _VT]]) -> dict[_KT, list[_VT]]:
     return res
 
 
-def get_survey_magsys(name, kcor_names: Iterable, trans_thresh=1e-6) -> tuple[dict[tuple[str, str], list[Bandpass]], MagSys]:
-    kcor_names = list(map(Path, kcor_names))
+def get_survey_magsys(name, kcor_names: Iterable, trans_thresh=1e-6,
+                      cache_dir: Union[Path, bool, None] = None) -> tuple[dict[tuple[str, str], list[Bandpass]], MagSys]:
+    """Combine kcor files into bands per (survey, filter) and a magnitude system.
 
-    kcors = {kcor_name.stem: KCor.from_fits(fits.open(kcor_name), trans_thresh) for kcor_name in kcor_names}
+    Parsed files are cached in ``cache_dir`` (in `default_cache_dir` if
+    ``True``), or, by default, not at all.
+    """
+    if cache_dir is True:
+        cache_dir = default_cache_dir()
+    kcors = [KCor.load(kcor_name, trans_thresh, cache_dir or None) for kcor_name in kcor_names]
 
     magsys = CompositeMagSys(name, {
         band: kcor.zpoffs[name]
-        for kcor in kcors.values()
+        for kcor in kcors
         for name, band in kcor.bands.items()
     })
 
     bandmap = multivaluedict(
-        ((survey, bandname[-1]), kcors[kcor_name.stem].bands[bandname])
-        for kcor_name in kcor_names for header in [fits.open(kcor_name)[0].header]
-        for i in range(header['NFILTERS']) for hkey in [f'FILT{i+1:0>3}'] for bandname in [header[hkey]]
-        for survey in [header.comments[hkey].rsplit('SURVEY=', 1)[1]] if survey
+        ((survey, bandname[-1]), kcor.bands[bandname])
+        for kcor in kcors for bandname, survey in kcor.surveys.items()
     )
 
     return bandmap, magsys
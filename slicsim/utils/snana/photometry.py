@@ -0,0 +1,152 @@
+"""Bulk reading of SNANA FITS photometry (``*_HEAD.FITS`` / ``*_PHOT.FITS``)."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence, Union
+
+import numpy as np
+import torch
+from astropy.io import fits
+
+from ...bandpasses.bandpass import Bandpass
+from ...bandpasses.magsys import MagSys
+
+
+_PathT = Union[str, PathLike]
+
+# FITS photometry columns and their names in text files (as used by `SurveyData`)
+TEXT_COLUMNS = {
+    'BAND': 'FLT', 'ZEROPT': 'ZPTAVG', 'ZEROPT_ERR': 'ZPTSIG', 'SKY_SIG': 'SKYSIG',
+    'PSF_SIG1': 'PSF1', 'PSF_SIG2': 'PSF2', 'PSF_RATIO': 'PSFRATIO',
+}
+
+
+def _native(a: np.ndarray) -> np.ndarray:
+    """Native byte order (FITS is big-endian), and stripped strings."""
+    if a.dtype.kind in 'SU':
+        return np.char.strip(a.astype(str))
+    return a.astype(a.dtype.newbyteorder('='), copy=False)
+
+
+def phot_path(head: _PathT) -> Path:
+    head = Path(head)
+    return head.with_name(head.name.replace('HEAD', 'PHOT'))
+
+
+@dataclass
+class PackedPhotometry:
+    """The photometry of many objects, stored flat.
+
+    The observations of object ``i`` are ``offsets[i]:offsets[i+1]`` in the
+    columns of `phot` (and in `band_codes`, which index `bands`), and its
+    header entries are ``meta[key][i]``.
+    """
+
+    offsets: np.ndarray  # [N_objects + 1]
+    phot: Mapping[str, np.ndarray]  # [N_obs]
+    meta: Mapping[str, np.ndarray]  # [N_objects]
+    bands: Sequence[str]
+    band_codes: np.ndarray  # [N_obs]
+
+    @property
+    def nobs(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> tuple[Mapping[str, np.ndarray], Mapping[str, np.ndarray]]:
+        """The header and photometry of the ``i``-th object."""
+        sl = slice(*self.offsets[i:i+2])
+        return {key: val[i] for key, val in self.meta.items()}, {key: val[sl] for key, val in self.phot.items()}
+
+    @staticmethod
+    def _read(head: _PathT) -> tuple[Mapping[str, np.ndarray], Mapping[str, np.ndarray], np.ndarray]:
+        with fits.open(head, memmap=True) as hf, fits.open(phot_path(head), memmap=True) as pf:
+            meta, phot = hf[1].data, pf[1].data
+
+            # PTROBS are 1-based and inclusive, and skip the separator rows
+            start = np.asarray(meta['PTROBS_MIN'], dtype=np.int64) - 1
+            nobs = np.asarray(meta['PTROBS_MAX'], dtype=np.int64) - start
+            idx = np.arange(nobs.sum()) + np.repeat(start - np.cumsum(nobs) + nobs, nobs)
+
+            return (
+                {name: _native(meta[name]) for name in meta.names},
+                {name: _native(phot[name][idx]) for name in phot.names},
+                nobs
+            )
+
+    @classmethod
+    def from_fits(cls, heads: Iterable[_PathT]) -> PackedPhotometry:
+        """Read the given HEAD files and the corresponding PHOT files."""
+        metas, phots, nobs = zip(*map(cls._read, heads))
+        meta, phot = ({key: np.concatenate([_[key] for _ in d]) for key in d[0]} for d in (metas, phots))
+
+        bands, band_codes = np.unique(phot.pop('BAND' if 'BAND' in phot else 'FLT'), return_inverse=True)
+        return cls(np.concatenate(([0], np.cumsum(np.concatenate(nobs)))), phot, meta, bands.tolist(), band_codes)
+
+    @classmethod
+    def from_dir(cls, path: _PathT, pattern='*HEAD.FITS*') -> PackedPhotometry:
+        return cls.from_fits(sorted(Path(path).glob(pattern)))
+
+    def save(self, path: _PathT):
+        """Save as a directory of ``.npy`` files, which `load` memory-maps."""
+        (path := Path(path)).mkdir(parents=True, exist_ok=True)
+        np.save(path / 'offsets.npy', self.offsets)
+        np.save(path / 'band_codes.npy', self.band_codes)
+        for prefix, columns in (('phot', self.phot), ('meta', self.meta)):
+            for key, val in columns.items():
+                np.save(path / f'{prefix}.{key}.npy', val)
+        (path / 'index.json').write_text(json.dumps(dict(
+            bands=list(self.bands), phot=list(self.phot), meta=list(self.meta))))
+
+    @classmethod
+    def load(cls, path: _PathT, mmap=True) -> PackedPhotometry:
+        path = Path(path)
+        index = json.loads((path / 'index.json').read_text())
+        mmap_mode = 'r' if mmap else None
+        return cls(
+            np.load(path / 'offsets.npy', mmap_mode=mmap_mode),
+            *({key: np.load(path / f'{prefix}.{key}.npy', mmap_mode=mmap_mode) for key in index[prefix]}
+              for prefix in ('phot', 'meta')),
+            index['bands'], np.load(path / 'band_codes.npy', mmap_mode=mmap_mode)
+        )
+
+    @classmethod
+    def cached(cls, path: _PathT, heads: Iterable[_PathT]) -> PackedPhotometry:
+        """Load from ``path`` if it was saved from the same (unmodified)
+        ``heads``; otherwise, read the FITS files and save to ``path``."""
+        heads = list(map(Path, heads))
+        sources = [[str(h), p.stat().st_mtime_ns] for h in heads for p in (h, phot_path(h))]
+
+        path = Path(path)
+        if (sfile := path / 'sources.json').exists() and json.loads(sfile.read_text()) == sources:
+            return cls.load(path)
+
+        self = cls.from_fits(heads)
+        self.save(path)
+        sfile.write_text(json.dumps(sources))
+        return self
+
+    def to_survey_data(self, bandmap: Mapping[str, Bandpass], magsys: MagSys):
+        """All objects as a `SurveyData` on a `FieldBatch`, with times relative to ``PEAKMJD``."""
+        from ...model import FieldBatch
+        from ...survey import SurveyData
+
+        extra_data = SurveyData._columns_data({TEXT_COLUMNS.get(key, key): val for key, val in self.phot.items()})
+        if 'PEAKMJD' in self.meta:
+            extra_data['mjd'] = extra_data['mjd'] - torch.as_tensor(
+                np.repeat(self.meta['PEAKMJD'], self.nobs), dtype=extra_data['mjd'].dtype)
+
+        return SurveyData(
+            field=FieldBatch.from_codes(
+                times=extra_data.pop('mjd'),
+                band_table=[bandmap[band] for band in self.bands],
+                codes=torch.tensor(self.band_codes),
+                magsys=magsys, nobs=self.nobs.tolist()
+            ), **extra_data
+        )
@@ -1,10 +1,9 @@
 import inspect
 from typing import Annotated, Any, ClassVar, get_args, get_origin, get_type_hints, Mapping, TypeVar
 
-import forge
 from typing_extensions import Self
 
-from feign import copy_function, feign
+from . import cached_property
 
 
 _T = TypeVar('_T')
@@ -31,7 +30,36 @@ class UtilityBase:
     def is_include(cls, hint) -> bool:
         return get_origin(hint) is Annotated and get_args(hint)[1] is cls._include
 
-    _params: ClassVar[Mapping[str, Any]]
+    # Both the parameters and the signature of ``__call__`` are only
+    # computed on first access (per class), since resolving type hints and
+    # rewriting signatures for every subclass is slow at import time.
+
+    @classmethod
+    @cached_property
+    def _params(cls) -> Mapping[str, Any]:
+        return dict((
+            item for item in get_type_hints(cls, include_extras=True).items()
+            for name, hint in [item]
+            if cls.is_include(hint) or not (
+                name.startswith('_')
+                or cls.is_private(hint)
+                or get_origin(hint) is ClassVar
+                or isinstance(getattr(cls, item[0], None), property)
+            )))
+
+    class _CallSignature:
+        """The signature of instances' ``__call__`` with the parameters as keyword arguments."""
+
+        def __get__(self, instance, owner) -> inspect.Signature:
+            if instance is None:
+                # the class itself has the signature of its constructor
+                raise AttributeError('__signature__')
+            if '_call_signature' not in owner.__dict__:
+                sig = inspect.signature(owner.fix_call_signature())
+                owner._call_signature = sig.replace(parameters=tuple(sig.parameters.values())[1:])
+            return owner._call_signature
+
+    __signature__ = _CallSignature()
 
     def set_params(self, **kwargs) -> Self:
         for key, val in kwargs.items():
@@ -41,7 +69,9 @@ class UtilityBase:
 
     @classmethod
     def fix_call_signature(cls):
-        # return cls.__call__
+        import forge
+        from feign import copy_function, feign
+
         return feign(copy_function(cls.__call__), inspect.signature(forge.compose(*(
             forge.delete(name)
             for name, param in inspect.signature(cls.__call__).parameters.items()
@@ -54,13 +84,6 @@ class UtilityBase:
     def __init_subclass__(cls, /, **kwargs):
         super().__init_subclass__(**kwargs)
 
-        cls._params = dict((
-            item for item in get_type_hints(cls, include_extras=True).items()
-            for name, hint in [item]
-            if cls.is_include(hint) or not (
-                name.startswith('_')
-                or cls.is_private(hint)
-                or get_origin(hint) is ClassVar
-                or isinstance(getattr(cls, item[0], None), property)
-            )))
-        cls.__call__ = cls.fix_call_signature()
+        # The lazy attribute is replaced by its value in the class it is
+        # accessed on, so every class needs its own.
+        cls._params = UtilityBase.__dict__['_params']
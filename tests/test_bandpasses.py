@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pytest
+import torch
+
+import phytorchx
+import slicsim.bandpasses as bandpasses
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(bandpasses, 'archive_paths', lambda: (tmp_path / 'bandpasses.bin', tmp_path / 'bandpasses.json'))
+    bandpasses._archive.cache_clear()
+    yield tmp_path
+    bandpasses._archive.cache_clear()
+
+
+@pytest.mark.parametrize('dtype', ('<f4', '<f8', '>f8'))
+def test_archive_dtype(archive, dtype):
+    wave, trans = np.linspace(4000, 5000, 11), np.linspace(0, 1, 11)
+    np.concatenate((wave, trans)).astype(dtype).tofile(archive / 'bandpasses.bin')
+    (archive / 'bandpasses.json').write_text(json.dumps(dict(dtype=dtype, bands=dict(packed=(0, 11)))))
+
+    data, index = bandpasses._archive()
+    assert data.dtype == torch.from_numpy(np.empty(0, np.dtype(dtype).newbyteorder('='))).dtype
+    assert torch.equal(data[11:22], torch.from_numpy(trans).to(data.dtype))
+
+
+def test_dir(archive):
+    (archive / 'bandpasses.bin').write_bytes(b'')
+    (archive / 'bandpasses.json').write_text(json.dumps(dict(dtype='<f4', bands=dict(packed=(0, 0)))))
+
+    names = dir(bandpasses)
+    assert 'packed' in names
+    assert {p.stem for p in bandpasses.bandpassdir.rglob('*.pt')} <= set(names)
+
+
+def test_packed_matches_files():
+    fname = next(bandpasses.bandpassdir.rglob('*.pt'))
+    wave, trans = phytorchx.load(fname)
+    band = getattr(bandpasses, fname.stem)
+    assert torch.allclose(band._wave, torch.as_tensor(wave, dtype=band._wave.dtype))
+    assert torch.allclose(band._trans, torch.as_tensor(trans, dtype=band._trans.dtype))
@@ -0,0 +1,22 @@
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Phaseshifted, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.sources.salt import SALT2Source
+
+
+def test_compile_keeps_eager_results():
+    field = Field(times=torch.linspace(-10, 40, 8), bands=8*[bandpasses.des_r], magsys=AB)
+    model = LightcurveModel(Distance(Redshifted(Phaseshifted(SALT2Source()))), field, unitless=True)
+    params = dict(z=0.3, phase0=1., x_1=torch.tensor([0.5]), c=0.1)
+
+    before = model.bandcountscal(**params)
+    compiled = model.compile()(**params)
+    after = model.bandcountscal(**params)
+
+    # the results are subnormal in single precision
+    assert (before != 0).all()
+    assert torch.equal(before, after)
+    assert torch.allclose(compiled, before, rtol=1e-5, atol=0)
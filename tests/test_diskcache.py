@@ -0,0 +1,73 @@
+import pytest
+import torch
+
+from slicsim.utils import diskcache
+from slicsim.utils.diskcache import DiskCache, cached, fingerprint, set_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    set_cache(tmp_path)
+    yield diskcache.get_cache()
+    set_cache(False)
+
+
+class Counter:
+    def __init__(self, value):
+        self.value, self.calls = value, 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_hit_and_miss(cache):
+    data = torch.linspace(0, 1, 11)
+    func = Counter(2 * data)
+
+    assert torch.equal(cached(func, 'key', data), 2 * data)
+    assert torch.equal(cached(func, 'key', data), 2 * data)
+    assert func.calls == 1
+    assert len(list(cache.path.glob('*.pt'))) == 1
+
+    # any change to the key misses
+    cached(func, 'key', data + 1)
+    cached(func, 'key', data.double())
+    cached(func, 'other', data)
+    assert func.calls == 4
+
+
+def test_requires_grad(cache):
+    data = torch.linspace(0, 1, 11, requires_grad=True)
+    func = Counter(2 * data)
+    assert cached(func, 'key', data) is func.value
+    assert cached(func, 'key', data) is func.value
+    assert func.calls == 2
+    assert not any(cache.path.iterdir())
+
+
+def test_disabled():
+    set_cache(None)
+    func = Counter(torch.zeros(3))
+    cached(func, 'key')
+    cached(func, 'key')
+    assert func.calls == 2
+    set_cache(False)
+
+
+def test_evict(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=4000)
+    for i in range(10):
+        cache.put(str(i), torch.zeros(100))
+    assert sum(f.stat().st_size for f in tmp_path.glob('*.pt')) <= 4000
+    # the most recently stored entry survives
+    assert torch.equal(cache.get('9'), torch.zeros(100))
+    assert cache.get('0') is None
+
+
+def test_fingerprint():
+    assert fingerprint(torch.zeros(2)) != fingerprint(torch.zeros(2, 1))
+    assert fingerprint(torch.zeros(2)) != fingerprint(torch.zeros(2, dtype=torch.float64))
+    assert fingerprint([1, 'a']) == fingerprint((1, 'a'))
+    with pytest.raises(TypeError):
+        fingerprint(object())
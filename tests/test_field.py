@@ -0,0 +1,34 @@
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.sources.hsiao import HsiaoSource
+from slicsim.sources.salt import SALT2Source
+
+
+def test_from_codes():
+    times, codes = torch.linspace(-10, 30, 50), torch.arange(50) % 3
+    table = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i]
+    coded = Field.from_codes(times, table + [bandpasses.des_g], codes, AB)
+    listed = Field(times, [table[i] for i in codes.tolist()], AB)
+
+    assert coded.band_table == table and torch.equal(coded.band_codes, codes)
+    assert list(coded.bands) == listed.bands and coded.bands[4] is bandpasses.des_r
+    assert torch.equal(
+        LightcurveModel(Distance(HsiaoSource()), coded).bandcountscal(),
+        LightcurveModel(Distance(HsiaoSource()), listed).bandcountscal())
+
+
+def test_tiled():
+    bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i]
+    # repeated epochs in the same band share a tile row
+    times = torch.tensor([0., 0., 0., 5., 5., 10., 10., 10., -3., 20., 0., 5.])
+    bands = [bands[i % 3] for i in range(len(times))]
+    source, params = Distance(Redshifted(SALT2Source())), dict(z=0.2, x_1=torch.tensor([0.3]), c=0.05)
+
+    tiled = Field(times, bands, AB, tiled=True)
+    untiled = LightcurveModel(source, Field(times, bands, AB)).bandcountscal(**params)
+    assert torch.allclose(LightcurveModel(source, tiled).bandcountscal(**params), untiled, rtol=1e-6, atol=0)
+    assert len(tiled._evaluation_points.times) < sum(len(band.wave) for band in bands)
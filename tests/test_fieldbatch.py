@@ -0,0 +1,46 @@
+import pytest
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Redshifted
+from slicsim.model import Field, FieldBatch, LightcurveModel
+from slicsim.sources.snemo import SNEMO7Source
+
+
+@pytest.fixture(scope='module')
+def fields():
+    bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i]
+    return [
+        Field(times=torch.linspace(-10, 30, n), bands=[bands[i % 3] for i in range(n)], magsys=AB)
+        for n in (5, 3, 7)
+    ]
+
+
+def test_shared_parameters(fields):
+    batch = LightcurveModel(Distance(Redshifted(SNEMO7Source())), FieldBatch.from_fields(fields))
+    coeffs = torch.linspace(-0.1, 0.1, 6)
+    z = torch.tensor([0.1, 0.2, 0.3])
+
+    shared = batch.bandcountscal(z=z, coeffs=coeffs[None], A_s=0.1)
+    expanded = batch.bandcountscal(z=z, coeffs=coeffs.expand(3, 6), A_s=torch.full((3,), 0.1))
+    assert torch.allclose(shared, expanded, rtol=1e-6, atol=0)
+
+    with pytest.raises(ValueError, match='coeffs'):
+        batch.bandcountscal(z=z, coeffs=coeffs, A_s=0.1)
+
+
+def test_matches_fields(fields):
+    source = Distance(Redshifted(SNEMO7Source()))
+    z, A_s = torch.tensor([0.1, 0.2, 0.3]), torch.tensor([0.1, 0., -0.1])
+    coeffs = torch.randn(3, 6, generator=torch.Generator().manual_seed(0)) / 10
+
+    batch = FieldBatch.from_fields(fields)
+    flat = LightcurveModel(source, batch).bandcountscal(z=z, coeffs=coeffs, A_s=A_s)
+    for res, field, *params in zip(batch.split(flat), fields, z, coeffs, A_s):
+        single = LightcurveModel(source, field).bandcountscal(**dict(zip(('z', 'coeffs', 'A_s'), params)))
+        assert torch.allclose(res, single, rtol=1e-6, atol=0)
+
+    padded, mask = batch.pad(flat)
+    assert mask.sum(-1).tolist() == [len(f.bands) for f in fields]
+    assert torch.equal(padded[mask], flat)
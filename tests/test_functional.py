@@ -0,0 +1,57 @@
+import pytest
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import affected, Distance, Phaseshifted, Redshifted
+from slicsim.functional import evaluate, unpack
+from slicsim.model import Field, LightcurveModel
+from slicsim.sources.salt import SALT2Source
+
+
+NAMES = ('z', 'phase0', 'x_1', 'c')
+PACKED = torch.tensor([[0.3, 1., 0.5, 0.1], [0.5, -2., -1., 0.], [0.1, 0., 0., 0.2]])
+
+
+@pytest.fixture
+def model():
+    bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i, bandpasses.des_z]
+    field = Field(torch.linspace(-15, 40, 12), 3 * bands, AB)
+    return LightcurveModel(affected(SALT2Source(), Phaseshifted(), Redshifted(), Distance()), field)
+
+
+def eager(model, p, method='bandcountscal'):
+    return getattr(model, method)(z=p[0], phase0=p[1], x_1=p[2], c=p[3])
+
+
+@pytest.mark.parametrize('method', ('bandcountscal', 'bandfluxcal'))
+def test_vmap(model, method):
+    ref = torch.stack([eager(model, p, method) for p in PACKED])
+    res = torch.func.vmap(lambda p: evaluate(model, p, method, names=NAMES))(PACKED)
+    assert torch.allclose(res, ref, rtol=1e-5)
+
+
+def test_jacrev(model):
+    ref = torch.stack([torch.autograd.functional.jacobian(lambda p: eager(model, p), p) for p in PACKED])
+    res = torch.func.vmap(torch.func.jacrev(lambda p: evaluate(model, p, names=NAMES)))(PACKED)
+    assert res.shape == (len(PACKED), len(model.field.times), len(NAMES))
+    assert torch.allclose(res, ref, rtol=1e-4, atol=1e-6 * ref.abs().max())
+
+
+def test_no_side_effects(model):
+    ref = eager(model, PACKED[0]).clone()
+    state = dict(vars(model.source))
+
+    res = evaluate(model, PACKED[1], names=NAMES)
+    assert vars(model.source).keys() == state.keys()
+    assert all(val is state[key] for key, val in vars(model.source).items())
+    assert not torch.equal(res, ref)
+    assert torch.equal(eager(model, PACKED[0]), ref)
+
+
+def test_unpack():
+    params = unpack(torch.arange(10.).reshape(2, 5), ('a', ('b', 3), 'c'))
+    assert torch.equal(params['a'], torch.tensor([0., 5.]))
+    assert params['b'].shape == (2, 3)
+    with pytest.raises(ValueError):
+        unpack(torch.zeros(4), ('a', ('b', 2)))
@@ -0,0 +1,19 @@
+import pytest
+
+import slicsim.bandpasses.magsys as magsys
+
+
+@pytest.mark.parametrize('name', ('CSPMagSys_K17', 'CSPMagSys_SNANA', 'CSPMagSys_BayeSN'))
+def test_composite_magsys(name):
+    ms = getattr(magsys, name)()
+    assert isinstance(ms, magsys.CompositeMagSys)
+
+    bands = list(ms.bands)
+    zps = ms.zp_counts_many(bands)
+    assert zps.shape == (len(bands),)
+    assert (zps.value > 0).all()
+
+
+def test_lazy_aliases():
+    assert magsys.Vega is magsys.alpha_lyr_mod_001
+    assert isinstance(magsys.BD17, magsys.InterpolatedSpectralMagSys)
@@ -0,0 +1,88 @@
+import pytest
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Phaseshifted, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.sources.hsiao import HsiaoSource
+from slicsim.sources.salt import SALT2Source
+
+
+SOURCES = {
+    SALT2Source: dict(z=0.2, phase0=1., x_1=torch.tensor([0.3]), c=0.05),
+    HsiaoSource: dict(z=0.2, phase0=1.),
+}
+
+
+@pytest.fixture(scope='module')
+def field():
+    bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i]
+    return Field(times=torch.linspace(-10, 30, 12), bands=[bands[i % 3] for i in range(12)], magsys=AB)
+
+
+def model(source, field, **kwargs):
+    return LightcurveModel(Distance(Redshifted(Phaseshifted(source()))), field, **kwargs)
+
+
+@pytest.mark.parametrize('source', SOURCES)
+@pytest.mark.parametrize('method', ('bandcountscal', 'bandfluxcal', 'bandcounts', 'bandflux'))
+def test_unitless(field, source, method):
+    params = SOURCES[source]
+    ref = getattr(model(source, field), method)(**params)
+    res = getattr(model(source, field, unitless=True), method)(**params)
+
+    assert type(res) is type(ref)
+    if method.endswith('cal'):
+        assert torch.equal(res, ref)
+    else:
+        assert res.unit == ref.unit and torch.equal(res.value, ref.value)
+
+
+def _to(params, dtype):
+    return {key: val.to(dtype) if torch.is_tensor(val) else val for key, val in params.items()}
+
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_to(field, source):
+    params = SOURCES[source]
+    ref_model = model(source, field)
+    ref = ref_model.bandcountscal(**params)
+
+    res = ref_model.to(torch.float64).bandcountscal(**_to(params, torch.float64))
+    assert res.dtype == torch.float64
+    assert torch.allclose(res, ref.double(), rtol=1e-5)
+
+    # the original model (and its class-level data) is left untouched
+    assert torch.equal(ref_model.bandcountscal(**params), ref)
+    assert torch.equal(model(source, field).bandcountscal(**params), ref)
+
+    # converting back reuses the original data
+    assert torch.equal(ref_model.to(torch.float64).to(torch.float32).bandcountscal(**params), ref)
+
+
+def test_field_to(field):
+    res = field.to(torch.float64)
+    assert res.dtype == torch.float64 and res.times.dtype == torch.float64
+    assert torch.equal(res.times, field.times.double())
+    assert res.band_zpcounts.dtype == torch.float64 and res.band_zpcounts.unit == field.band_zpcounts.unit
+    assert torch.allclose(res.band_zpcounts.value, field.band_zpcounts.value.double(), rtol=1e-5)
+    assert field.times.dtype == torch.float32
+
+
+@pytest.mark.parametrize('method', ('bandcountscal', 'bandfluxcal'))
+def test_checkpoint_points(field, method):
+    params = {key: torch.as_tensor(val).requires_grad_() for key, val in SOURCES[SALT2Source].items()}
+    npoints = len(field._evaluation_points.times)
+
+    ref = getattr(model(SALT2Source, field, unitless=True), method)(**params)
+    ref_grads = torch.autograd.grad(ref.sum(), list(params.values()))
+    for points in (npoints // 5, npoints // 2 + 1, npoints):
+        res = getattr(model(SALT2Source, field, unitless=True, checkpoint_points=points), method)(**params)
+        grads = torch.autograd.grad(res.sum(), list(params.values()))
+        assert torch.allclose(res, ref, rtol=1e-5)
+        for g, ref_g in zip(grads, ref_grads):
+            assert torch.allclose(g, ref_g, rtol=1e-4, atol=1e-6 * ref_g.abs().max())
+
+        with torch.no_grad():
+            assert torch.equal(getattr(model(SALT2Source, field, unitless=True, checkpoint_points=points), method)(**params), res.detach())
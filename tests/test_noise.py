@@ -0,0 +1,24 @@
+import pytest
+import torch
+
+NoiseModel = pytest.importorskip('slicsim.survey.noise', exc_type=ImportError).NoiseModel
+
+
+@pytest.fixture
+def noise():
+    return NoiseModel(zp_mag=torch.tensor([30., 31., 29.5]), background=torch.tensor([200., 50., 400.]),
+                      gain=torch.tensor([2., 4., 1.]))
+
+
+@pytest.mark.parametrize('poisson', (False, True))
+def test_sample(noise, poisson):
+    fluxcal = torch.tensor([100., 20., 500.])
+
+    noisy, err = noise.sample(fluxcal, 20_000, poisson=poisson, generator=torch.Generator().manual_seed(0))
+    assert noisy.shape == err.shape == (20_000, 3)
+    assert torch.equal(err[0], noise.fluxcalerr(fluxcal))
+    assert torch.allclose(noisy.mean(0), fluxcal, atol=0, rtol=0.05)
+    assert torch.allclose(noisy.std(0), err[0], atol=0, rtol=0.05)
+
+    again, _ = noise.sample(fluxcal, 20_000, poisson=poisson, generator=torch.Generator().manual_seed(0))
+    assert torch.equal(noisy, again)
@@ -0,0 +1,48 @@
+from functools import partial
+
+import pytest
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.parallel import share_memory, SimulationPool
+from slicsim.sources.salt import SALT2Source
+
+
+def simulate(params, generator, index):
+    return params['x'].sum()
+
+
+def test_share_memory_partial():
+    params = dict(x=torch.ones(10))
+    share_memory(partial(simulate, params))
+    assert params['x'].is_shared()
+
+
+def test_share_memory_skips_file_backed():
+    data = SALT2Source._delayed_data
+    tensors = [t for t in data if torch.is_tensor(t)]
+    share_memory(data)
+    assert not any(t.is_shared() for t in tensors)
+
+
+def simulate_model(model, generator, index):
+    z = 0.1 + 0.3 * torch.rand((), generator=generator)
+    return z, model.bandcountscal(z=z, x_1=torch.randn(1, generator=generator), c=0.)
+
+
+@pytest.mark.parametrize('context', ('fork', 'spawn'))
+def test_pool_reproducible(context):
+    field = Field(times=torch.linspace(-10, 40, 8), bands=8*[bandpasses.des_r], magsys=AB)
+    simulate = partial(simulate_model, LightcurveModel(Distance(Redshifted(SALT2Source())), field))
+    simulate(torch.Generator(), 0)
+
+    serial = list(SimulationPool(simulate, nworkers=0, seed=1).map(5))
+    with SimulationPool(simulate, nworkers=2, seed=1, context=context) as pool:
+        parallel = list(pool.map(5))
+
+    assert len({z.item() for z, _ in serial}) == 5
+    for (z0, res0), (z1, res1) in zip(serial, parallel):
+        assert torch.equal(z0, z1) and torch.equal(res0, res1)
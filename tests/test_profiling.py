@@ -0,0 +1,28 @@
+import pytest
+import torch
+
+import slicsim
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Phaseshifted, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.sources.hsiao import HsiaoSource
+
+
+@pytest.mark.parametrize('memory', (False, True))
+def test_stages(memory):
+    bands = [bandpasses.des_g, bandpasses.des_r]
+    field = Field(times=torch.linspace(-10, 30, 20), bands=[bands[i % 2] for i in range(20)], magsys=AB)
+    model = LightcurveModel(Distance(Redshifted(Phaseshifted(HsiaoSource()))), field)
+    model.bandcountscal(z=0.1, phase0=1.)
+
+    with slicsim.profile(memory=memory) as p:
+        model.bandcountscal(z=0.1, phase0=1.)
+    stats = {s['stage']: s for s in p.summary()}
+
+    assert {'source', 'effects', 'base_source', 'interpolation', 'reduce'} <= set(stats)
+    # the nested effects are recorded once per evaluation
+    assert stats['effects']['calls'] == stats['base_source']['calls'] == 1
+    assert stats['source']['time'] >= stats['effects']['time'] >= stats['base_source']['time']
+    if memory:
+        assert stats['source']['peak_bytes'] > 0
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.model import Field, FieldBatch
+from slicsim.shards import ShardReader, ShardWriter
+
+
+def test_roundtrip(tmp_path):
+    bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i]
+    gen = torch.Generator().manual_seed(0)
+
+    field = Field(times=torch.linspace(-10, 30, 4), bands=[bands[i % 3] for i in range(4)], magsys=AB)
+    fluxcal, z = torch.randn(5, 4, generator=gen), torch.rand(5, generator=gen)
+
+    fields = [Field(times=torch.arange(float(n)), bands=n * [bands[n % 3]], magsys=AB) for n in (2, 3, 1)]
+    batch = FieldBatch.from_fields(fields)
+    bfluxcal, bz = torch.randn(sum(batch.nobs), generator=gen), torch.rand(3, generator=gen)
+
+    with ShardWriter(tmp_path / 'sims', shard_size=3) as writer:
+        writer.add(field, fluxcal, dict(z=z, x_1=torch.tensor(0.5)), fluxcalerr=torch.tensor(0.1))
+        writer.add(batch, bfluxcal, dict(z=bz, x_1=torch.full((3,), 0.5)), fluxcalerr=torch.full_like(bfluxcal, 0.1))
+
+    reader = ShardReader(tmp_path / 'sims')
+    assert len(reader) == 8 and len(reader.manifest['shards']) == 3
+    assert reader.bands == [band.name for band in bands]
+
+    expected = [
+        (field.times, [band.name for band in field.bands], fluxcal[i], z[i]) for i in range(5)
+    ] + [
+        (f.times, [band.name for band in f.bands], res, bz[i])
+        for i, (f, res) in enumerate(zip(fields, batch.split(bfluxcal)))
+    ]
+    for i, (times, names, flux, zz) in enumerate(expected):
+        sample = reader[i]
+        assert np.array_equal(sample['times'], times.numpy())
+        assert [reader.bands[b] for b in sample['bands']] == names
+        assert np.array_equal(sample['fluxcal'], flux.numpy())
+        assert np.all(sample['fluxcalerr'] == np.float32(0.1))
+        assert sample['z'] == zz.item() and sample['x_1'] == 0.5
+    assert np.array_equal(reader[-1]['fluxcal'], expected[-1][2].numpy())
+
+    with pytest.raises(IndexError):
+        reader[8]
+    with pytest.raises(FileExistsError):
+        ShardWriter(tmp_path / 'sims')
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import torch
+from astropy.io import fits
+
+from slicsim.bandpasses.magsys import CompositeMagSys
+from slicsim.utils.snana.kcor import get_survey_magsys, KCor
+
+
+@pytest.fixture
+def kcor(tmp_path):
+    header = fits.Header()
+    header['NFILTERS'] = 2
+    header['FILT001'] = 'DES-g', 'SURVEY=DES'
+    header['FILT002'] = 'DES-r', 'SURVEY=DES'
+
+    wave = np.arange(3000., 10000., 10.)
+    hdus = [
+        fits.PrimaryHDU(header=header),
+        fits.BinTableHDU.from_columns([
+            fits.Column('FILTER', '20A', array=['DES-g', 'DES-r']),
+            fits.Column('MAGSYS', '20A', array=['AB1', 'AB1']),
+            fits.Column('ZPOFF', 'E', array=[0.01, -0.02]),
+        ]),
+        fits.ImageHDU(), fits.ImageHDU(), fits.ImageHDU(),
+        fits.BinTableHDU.from_columns([
+            fits.Column('wavelength', 'E', array=wave),
+            fits.Column('DES-g', 'E', array=np.exp(-((wave - 4800) / 500)**2)),
+            fits.Column('DES-r', 'E', array=np.exp(-((wave - 6400) / 500)**2)),
+        ]),
+        fits.BinTableHDU.from_columns([
+            fits.Column('wavelength', 'E', array=wave),
+            fits.Column('AB1', 'E', array=1e-8 * (5000 / wave)**2),
+        ]),
+    ]
+    # in the case used by SNANA (astropy upper-cases the name argument)
+    for i, name in ((1, 'ZPoff'), (5, 'FilterTrans'), (6, 'PrimarySED')):
+        hdus[i].header['EXTNAME'] = name
+    fits.HDUList(hdus).writeto(fname := tmp_path / 'kcor.fits')
+    return fname
+
+
+def test_load(kcor, tmp_path):
+    parsed = KCor.load(kcor)
+    assert set(parsed.bands) == {'DES-g', 'DES-r'} and set(parsed.magsys) == {'AB1'}
+    assert parsed.surveys == {'DES-g': 'DES', 'DES-r': 'DES'}
+    assert parsed.zpoffs['DES-r'].zp == pytest.approx(-0.02)
+    # transmissions below the threshold are cut
+    assert parsed.bands['DES-g']._wave.dtype == torch.get_default_dtype()
+    assert len(parsed.bands['DES-g']._wave) < 700
+
+    # a second load is served from the cache, with the same contents
+    for _ in range(2):
+        cached = KCor.load(kcor, cache_dir=tmp_path / 'cache')
+        assert len(list((tmp_path / 'cache').glob('*.pt'))) == 1
+        for name, band in parsed.bands.items():
+            assert torch.equal(cached.bands[name]._wave, band._wave)
+            assert torch.equal(cached.bands[name]._trans, band._trans)
+
+
+def test_survey_magsys(kcor, tmp_path):
+    bandmap, magsys = get_survey_magsys('DES', [kcor])
+    assert set(bandmap) == {('DES', 'g'), ('DES', 'r')}
+    assert isinstance(magsys, CompositeMagSys)
+
+    zps = magsys.zp_counts_many([bandmap['DES', 'g'][0], bandmap['DES', 'r'][0]])
+    assert (zps.value > 0).all()
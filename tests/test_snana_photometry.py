@@ -0,0 +1,57 @@
+import numpy as np
+from astropy.io import fits
+
+from slicsim.utils.snana.photometry import PackedPhotometry
+
+
+def write(path, name, objects):
+    # SNANA layout: the observations of all objects in one table, separated
+    # by a row with MJD = -777, and 1-based inclusive pointers in the header
+    rows, ptrs = [], []
+    for obs in objects:
+        ptrs.append((len(rows) + 1, len(rows) + len(obs)))
+        rows.extend(obs)
+        rows.append((-777., '-', 0.))
+
+    mjd, band, flux = zip(*rows)
+    fits.BinTableHDU.from_columns([
+        fits.Column('MJD', 'D', array=np.array(mjd)),
+        fits.Column('BAND', '2A', array=np.array(band)),
+        fits.Column('FLUXCAL', 'E', array=np.array(flux)),
+    ]).writeto(path / f'{name}_PHOT.FITS')
+    fits.BinTableHDU.from_columns([
+        fits.Column('SNID', '8A', array=np.array([f'{name}{i}' for i in range(len(objects))])),
+        fits.Column('PEAKMJD', 'D', array=np.array([obs[0][0] + 10 for obs in objects])),
+        fits.Column('PTROBS_MIN', 'J', array=np.array([p[0] for p in ptrs])),
+        fits.Column('PTROBS_MAX', 'J', array=np.array([p[1] for p in ptrs])),
+    ]).writeto(path / f'{name}_HEAD.FITS')
+
+
+def test_packed_photometry(tmp_path):
+    objects = {
+        'A': [[(100., 'g', 1.), (101., 'r', 2.)], [(200., 'i', 3.)]],
+        'B': [[(300., 'r', 4.), (301., 'r', 5.), (302., 'g', 6.)]],
+    }
+    for name, objs in objects.items():
+        write(tmp_path, name, objs)
+    expected = [obs for objs in objects.values() for obs in objs]
+    snids = [f'{name}{i}' for name, objs in objects.items() for i in range(len(objs))]
+
+    packed = PackedPhotometry.from_dir(tmp_path)
+    assert len(packed) == 3 and packed.nobs.tolist() == [2, 1, 3]
+    assert packed.bands == ['g', 'i', 'r']
+    for i, obs in enumerate(expected):
+        meta, phot = packed[i]
+        assert meta['SNID'] == snids[i] and meta['PEAKMJD'] == obs[0][0] + 10
+        assert phot['MJD'].tolist() == [o[0] for o in obs]
+        assert phot['FLUXCAL'].tolist() == [o[2] for o in obs]
+        sl = slice(*packed.offsets[i:i+2])
+        assert [packed.bands[c] for c in packed.band_codes[sl]] == [o[1] for o in obs]
+
+    cached = PackedPhotometry.cached(tmp_path / 'packed', sorted(tmp_path.glob('*HEAD.FITS')))
+    loaded = PackedPhotometry.cached(tmp_path / 'packed', sorted(tmp_path.glob('*HEAD.FITS')))
+    assert isinstance(loaded.offsets, np.memmap)
+    for res in (cached, loaded):
+        assert res.bands == packed.bands and np.array_equal(res.band_codes, packed.band_codes)
+        assert all(np.array_equal(res.phot[key], packed.phot[key]) for key in packed.phot)
+        assert all(np.array_equal(res.meta[key], packed.meta[key]) for key in packed.meta)
@@ -0,0 +1,28 @@
+import torch
+
+from slicsim import bandpasses
+from slicsim.bandpasses.magsys import AB
+from slicsim.effects import Distance, Phaseshifted, Redshifted
+from slicsim.model import Field, LightcurveModel
+from slicsim.sources.abc import DelayedGridInterpPCASource
+from slicsim.tables import ComponentBandTable
+from slicsim.utils import DataRegistry
+
+
+class UncolouredSALT2(DelayedGridInterpPCASource):
+    _delayed_data_func = DataRegistry.salt2_4
+
+
+def test_uncoloured_source():
+    bands = [bandpasses.des_g, bandpasses.des_r, bandpasses.des_i]
+    table = ComponentBandTable.build(UncolouredSALT2(), bands, grid_z=torch.linspace(0.1, 0.5, 9))
+    assert torch.equal(table.grid_colour, torch.tensor([0., 1.]))
+    assert table.flux.value.isfinite().all()
+
+    field = Field(times=torch.linspace(-10, 30, 30), bands=[bands[i % 3] for i in range(30)], magsys=AB)
+    params = dict(z=0.3, phase0=1., coeffs=0.5)
+    source = Distance(Redshifted(Phaseshifted(UncolouredSALT2())))
+    exact = LightcurveModel(source, field).bandcountscal(**params)
+    approx = LightcurveModel(source, field, table=table).bandcountscal(**params)
+    assert approx.isfinite().all()
+    assert ((approx - exact).abs() / exact.abs().max()).max() < 1e-2